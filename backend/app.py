@@ -1,174 +1,260 @@
-from flask import Flask, request, jsonify
+from startup import StartupProfile, FAST_STARTUP, is_reloader_parent
+startup_profile = StartupProfile('app')
+
+from flask import Flask, jsonify
 from flask_cors import CORS
-import base64
-import io
-from PIL import Image
+import os
+import threading
 import numpy as np
-import cv2
-import torch
-from transformers import (
-    pipeline,
-    AutoModelForSequenceClassification,
-    AutoTokenizer,
-    AutoModelForCausalLM
-)
 import warnings
+from batching import MicroBatcher
+from cascade import StageCounter, CASCADE_ENABLED
+from request_timing import timed_stage, init_request_timing, metrics_response
+from profiling import profiled
+from sentiment import WindowedSentiment, make_sentiment_cache
+from image_io import open_image, decode_stats, decode_time
+from uploads import read_analyze_request, read_batch_request
+from job_queue import open_job_queue, submit_analysis_job, job_status_response
+from model_registry import ModelRegistry, MODEL_WARMUP, liveness_response, readiness_response
+from result_cache import ResultCache, content_key, RESULT_CACHE_REUSE_CAPTIONS
+from sse import event_stream
+from json_encoding import NumpyJSONProvider
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
 CORS(app)  # Enable CORS for React frontend
+init_request_timing(app)
 
 # Global variables for models
 text_classifier = None
 caption_generator = None
-nsfw_detector = None
 resnet_model = None
+caption_engine = None
+image_engine = None
+text_scorer = None
 
-def initialize_models():
-    """Initialize all ML models on startup"""
-    global text_classifier, caption_generator, nsfw_detector, resnet_model
-    
-    print("Loading models...")
-    
-    # Text Classification - Content Moderation
-    # Using distilbert for faster inference
-    text_classifier = pipeline(
+# Prefill the shared caption context once per request instead of once per row
+CAPTION_PREFIX_CACHE = os.environ.get('CAPTION_PREFIX_CACHE', '1') == '1'
+
+TEXT_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# 'torch' runs DistilBERT and ResNet-50 eagerly; 'onnx' serves them through ONNX Runtime
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'torch').lower()
+active_engine = 'torch'
+
+# torch, transformers, cv2 and torchvision are imported by the stages that
+# use them, so the server can start listening before they are loaded
+def load_text_classifier():
+    """Text Classification - Content Moderation (distilbert for faster inference)"""
+    import torch
+    from transformers import pipeline
+    return pipeline(
         "text-classification",
-        model="distilbert-base-uncased-finetuned-sst-2-english",
+        model=TEXT_MODEL_ID,
         device=0 if torch.cuda.is_available() else -1
     )
-    
-    # Caption Generation - GPT-2 for social media captions
-    caption_generator = pipeline(
+
+def load_caption_generator():
+    """Caption Generation - GPT-2 for social media captions"""
+    import torch
+    from transformers import pipeline
+    return pipeline(
         "text-generation",
         model="gpt2",
         device=0 if torch.cuda.is_available() else -1
     )
+
+def load_resnet():
+    """Pretrained ResNet for image feature extraction"""
+    import torch
+    model = torch.hub.load('pytorch/vision:v0.10.0', 'resnet50', pretrained=True)
+    model.eval()
+    return model
+
+# Warmups go through the active (possibly ONNX) models, not the loader's return value
+def warm_text_classifier(_):
+    classify_text_batch(["Warming up"])
+
+def warm_caption_generator(generator):
+    generator("Warming up", max_new_tokens=4)
+
+def warm_resnet(_):
+    import torch
+    classify_image_batch([torch.zeros(3, 224, 224)])
+
+# Each model loads once, with its load time and memory reported in /api/stats
+models = ModelRegistry()
+models.register('text_classifier', load_text_classifier, warm_text_classifier)
+models.register('caption_generator', load_caption_generator, warm_caption_generator)
+models.register('resnet', load_resnet, warm_resnet)
+
+models_lock = threading.Lock()
+
+def initialize_models():
+    """Initialize all ML models (once; requests arriving meanwhile wait for it)"""
+    if image_engine is not None:
+        return
+    
+    with models_lock:
+        if image_engine is None:
+            load_all_models()
+            startup_profile.mark('models loaded')
+
+def load_all_models():
+    """Load every model and build the engines around them"""
+    global text_classifier, caption_generator, resnet_model, caption_engine, image_engine
+    global active_engine, text_scorer
+    from caption_engine import CaptionEngine
+    from image_engine import ImageAnalysisEngine
+    
+    print("Loading models...")
+    
+    text_classifier = models.get('text_classifier')
+    caption_generator = models.get('caption_generator')
+    
+    # All platform captions are sampled from GPT-2 in one batched pass
+    caption_engine = CaptionEngine(
+        caption_generator.model,
+        caption_generator.tokenizer,
+        reuse_prefix_cache=CAPTION_PREFIX_CACHE
+    )
+    
+    resnet_model = models.get('resnet')
     
-    # Load pretrained ResNet for image feature extraction
-    resnet_model = torch.hub.load('pytorch/vision:v0.10.0', 'resnet50', pretrained=True)
-    resnet_model.eval()
+    if INFERENCE_ENGINE == 'onnx':
+        from onnx_engine import load_onnx_models
+        text_classifier, resnet_model, active_engine = load_onnx_models(text_classifier, resnet_model)
+    
+    # Long posts are scored in overlapping token windows, not cut at 512 chars
+    text_scorer = WindowedSentiment(
+        text_classifier.tokenizer, text_batcher,
+        cache=sentiment_cache, model_version=f"{TEXT_MODEL_ID}@{active_engine}"
+    )
+    
+    # Face cascades and ResNet preprocessing are built once, not per request
+    image_engine = ImageAnalysisEngine(resnet_batcher.submit, timer=timed_stage)
     
     print("Models loaded successfully!")
 
-def preprocess_image(image_data):
-    """Preprocess image for CNN models"""
-    # Decode base64 image
-    if ',' in image_data:
-        image_data = image_data.split(',')[1]
-    
-    image_bytes = base64.b64decode(image_data)
-    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+def classify_text_batch(texts):
+    """Run the text classifier over a batch of inputs in one forward pass"""
+    return text_classifier(texts, batch_size=len(texts))
+
+def classify_image_batch(tensors):
+    """Run ResNet over a batch of preprocessed image tensors"""
+    import torch
+    with torch.no_grad():
+        output = resnet_model(torch.stack(tensors))
     
-    # Convert to numpy array for OpenCV
-    image_np = np.array(image)
+    probabilities = torch.nn.functional.softmax(output, dim=1)
+    top_prob, top_catid = torch.topk(probabilities, 3, dim=1)
+    return list(zip(top_prob.numpy(), top_catid.numpy()))
+
+# Concurrent requests share one forward pass per model
+text_batcher = MicroBatcher('text_classifier', classify_text_batch)
+resnet_batcher = MicroBatcher('resnet', classify_image_batch)
+
+# Sentiment and image analysis keyed by decoded image bytes + normalized text
+result_cache = ResultCache('analysis')
+
+# Classifier results keyed by model version + normalized text
+sentiment_cache = make_sentiment_cache()
+
+# Decodes and analyzes the images of a batch request in parallel
+BATCH_IMAGE_WORKERS = int(os.environ.get('BATCH_IMAGE_WORKERS', '4'))
+batch_image_pool = ThreadPoolExecutor(max_workers=BATCH_IMAGE_WORKERS, thread_name_prefix='batch_image')
+
+def preprocess_image(image_bytes):
+    """Preprocess image for CNN models"""
+    with timed_stage('decode'):
+        image = open_image(image_bytes, stages=('faces', 'edges', 'resnet'))
+        
+        # Convert to numpy array for OpenCV
+        image_np = np.array(image)
     
     return image, image_np
 
 def detect_image_content(image_np):
     """Analyze image using OpenCV and CNN"""
-    # Convert to grayscale for some OpenCV operations
-    gray = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
-    
-    # Detect faces using OpenCV Haar Cascade
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-    
-    # Edge detection for content analysis
-    edges = cv2.Canny(gray, 100, 200)
-    edge_density = np.sum(edges > 0) / edges.size
-    
-    # Color analysis
-    avg_color = np.mean(image_np, axis=(0, 1))
-    brightness = np.mean(avg_color)
-    
-    # Analyze with ResNet
-    # Preprocess for ResNet
-    from torchvision import transforms
-    preprocess = transforms.Compose([
-        transforms.ToPILImage(),
-        transforms.Resize(256),
-        transforms.CenterCrop(224),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-    ])
-    
-    input_tensor = preprocess(image_np)
-    input_batch = input_tensor.unsqueeze(0)
-    
-    with torch.no_grad():
-        output = resnet_model(input_batch)
-    
-    # Get top predictions
-    probabilities = torch.nn.functional.softmax(output[0], dim=0)
-    top_prob, top_catid = torch.topk(probabilities, 3)
-    
-    return {
-        'faces_detected': len(faces),
-        'edge_density': float(edge_density),
-        'brightness': float(brightness),
-        'has_people': len(faces) > 0,
-        'is_complex': edge_density > 0.1,
-        'top_predictions': [
-            {'confidence': float(top_prob[i]), 'category_id': int(top_catid[i])}
-            for i in range(3)
-        ]
-    }
+    return image_engine.analyze(image_np)
 
 def analyze_text_sentiment(text):
     """Analyze text using Hugging Face transformers"""
     if not text or len(text.strip()) == 0:
         return {'label': 'NEUTRAL', 'score': 0.5}
     
-    result = text_classifier(text[:512])[0]  # Limit text length
-    return result
+    with timed_stage('sentiment'):
+        return text_scorer.score(text)
 
-def generate_platform_captions(text, image_features):
-    """Generate platform-specific captions using GPT-2"""
+def neutral_image_features():
+    """Image features used when there is no image or its analysis is skipped"""
+    return {
+        'faces_detected': 0,
+        'edge_density': 0.0,
+        'brightness': 128.0,
+        'has_people': False,
+        'is_complex': False,
+        'top_predictions': []
+    }
+
+def analyze_image(image_bytes, skip=False):
+    """Analyze an uploaded image, or return neutral features when there is none"""
+    if not image_bytes:
+        return neutral_image_features()
+    if skip:
+        cascade_stages.skip('image_analysis')
+        return neutral_image_features()
     
-    # Create context based on image features
+    with cascade_stages.run('image_analysis'):
+        _, image_np = preprocess_image(image_bytes)
+        return detect_image_content(image_np)
+
+def make_moderation_decision(text_analysis):
+    """Turn the sentiment result into a moderation decision and confidence"""
+    if text_analysis['label'] == 'NEGATIVE' and text_analysis['score'] > 0.8:
+        return 'rejected', text_analysis['score']
+    if text_analysis['label'] == 'POSITIVE' and text_analysis['score'] > 0.7:
+        return 'approved', text_analysis['score']
+    return 'approved', 0.7
+
+# Faces, ResNet-50 and GPT-2 only run when the classifier leaves them needed
+cascade_stages = StageCounter(('image_analysis', 'captions'))
+
+def skipped_stages(text_analysis):
+    """Expensive stages the cascade leaves out once the text has been scored"""
+    # A rejected post is never published: its image features would only
+    # feed the caption prompt, and nobody needs its captions
+    decision, _ = make_moderation_decision(text_analysis)
+    if CASCADE_ENABLED and decision == 'rejected':
+        return ('image_analysis', 'captions')
+    return ()
+
+def analyze_image_after_text(image_bytes, text_future):
+    """Batch image analysis, skipped once the post's text score rejects it"""
+    if not image_bytes or not CASCADE_ENABLED:
+        return analyze_image(image_bytes)
+    text_analysis = text_future.result() if text_future else analyze_text_sentiment('')
+    return analyze_image(image_bytes, skip='image_analysis' in skipped_stages(text_analysis))
+
+def build_caption_context(text, image_features):
+    """Create the GPT-2 context shared by every platform prompt"""
     context = f"Create social media post about: {text}. "
     if image_features['has_people']:
         context += "Image contains people. "
     if image_features['is_complex']:
         context += "Image is detailed. "
+    return context
+
+def generate_platform_captions(text, image_features):
+    """Generate platform-specific captions using GPT-2"""
+    context = build_caption_context(text, image_features)
     
-    captions = {}
-    
-    # Instagram - More casual, emoji-friendly
-    instagram_prompt = f"{context} Instagram style with emojis:"
-    instagram_results = caption_generator(
-        instagram_prompt,
-        max_length=60,
-        num_return_sequences=3,
-        temperature=0.8,
-        do_sample=True
-    )
-    captions['instagram'] = [result['generated_text'].replace(instagram_prompt, '').strip()[:200] for result in instagram_results]
-    
-    # Facebook - More descriptive
-    facebook_prompt = f"{context} Facebook post:"
-    facebook_results = caption_generator(
-        facebook_prompt,
-        max_length=80,
-        num_return_sequences=3,
-        temperature=0.7,
-        do_sample=True
-    )
-    captions['facebook'] = [result['generated_text'].replace(facebook_prompt, '').strip()[:250] for result in facebook_results]
-    
-    # LinkedIn - Professional tone
-    linkedin_prompt = f"{context} Professional LinkedIn post:"
-    linkedin_results = caption_generator(
-        linkedin_prompt,
-        max_length=70,
-        num_return_sequences=3,
-        temperature=0.6,
-        do_sample=True
-    )
-    captions['linkedin'] = [result['generated_text'].replace(linkedin_prompt, '').strip()[:220] for result in linkedin_results]
-    
-    return captions
+    # Instagram (casual, emoji-friendly), Facebook (descriptive) and
+    # LinkedIn (professional) captions come from a single batched generate
+    with timed_stage('gpt2'):
+        return caption_engine.generate(context)
 
 def generate_hashtags(text, captions):
     """Generate relevant hashtags from text and captions"""
@@ -196,88 +282,330 @@ def generate_hashtags(text, captions):
     
     return hashtags
 
+def build_insights(text, text_analysis, decision, confidence, image_features):
+    """Calculate engagement insights for the response"""
+    return {
+        'engagement_score': min(95, int(confidence * 100 + np.random.randint(-5, 15))),
+        'sentiment': text_analysis['label'],
+        'toxicity_level': 'Low' if decision == 'approved' else 'High',
+        'readability': 'High' if len(text) < 200 else 'Medium',
+        'visual_appeal': 'High' if image_features['is_complex'] else 'Medium',
+        'authenticity': f"{int(confidence * 100)}%"
+    }
+
+def build_analysis_response(text, text_analysis, image_features, captions, skipped=()):
+    """Moderation decision, hashtags and insights around the stage results"""
+    # Make moderation decision
+    decision, confidence = make_moderation_decision(text_analysis)
+    
+    # Generate hashtags
+    hashtags = generate_hashtags(text, captions)
+    
+    return {
+        'decision': decision,
+        'confidence': confidence,
+        'captions': captions,
+        'hashtags': hashtags,
+        'insights': build_insights(text, text_analysis, decision, confidence, image_features),
+        'text_analysis': text_analysis,
+        'image_analysis': image_features,
+        'skipped_stages': list(skipped)
+    }
+
+def cache_stage_results(cache_key, text_analysis, image_features, captions):
+    """Keep a post's stage results for resubmissions (captions only when opted in)"""
+    # Only real model output gets here: a failed classifier, ResNet or decode
+    # raises and fails the request (or batch item) before anything is cached
+    result_cache.put(cache_key, {
+        'text_analysis': text_analysis,
+        'image_features': image_features,
+        'captions': captions if RESULT_CACHE_REUSE_CAPTIONS else None
+    })
+
+def analyze_post(text, image_bytes):
+    """Full analysis of one post, reusing cached stage results"""
+    initialize_models()
+    
+    # Resubmitted content reuses its earlier analysis
+    cache_key = content_key(image_bytes, text)
+    cached = result_cache.get(cache_key)
+    
+    # The classifier runs first and decides which expensive stages are needed
+    text_analysis = cached['text_analysis'] if cached else analyze_text_sentiment(text)
+    skipped = skipped_stages(text_analysis)
+    
+    if cached:
+        image_features = cached['image_features']
+    else:
+        # Analyze image if provided
+        image_features = analyze_image(image_bytes, skip='image_analysis' in skipped)
+    
+    # Generate platform-specific captions (sampled, so only reused when opted in)
+    if 'captions' in skipped:
+        cascade_stages.skip('captions')
+        captions = caption_engine.empty_captions()
+        if not cached:
+            cache_stage_results(cache_key, text_analysis, image_features, None)
+    elif cached and cached['captions'] is not None:
+        captions = cached['captions']
+    else:
+        with cascade_stages.run('captions'):
+            captions = generate_platform_captions(text, image_features)
+        cache_stage_results(cache_key, text_analysis, image_features, captions)
+    
+    return build_analysis_response(text, text_analysis, image_features, captions, skipped)
+
+def run_analysis_job(fields, image_bytes):
+    """Job queue handler: the same analysis as /api/analyze"""
+    return analyze_post(fields.get('text', ''), image_bytes)
+
+# Long caption runs can be queued instead of holding the request open
+job_queue = open_job_queue(app, run_analysis_job)
+
 @app.route('/api/analyze', methods=['POST'])
+@profiled
 def analyze_content():
     """Main endpoint for content analysis"""
     try:
-        data = request.json
-        text = data.get('text', '')
-        image = data.get('image', '')
-        
-        # Analyze text sentiment
-        text_analysis = analyze_text_sentiment(text)
-        
-        # Analyze image if provided
-        image_features = None
-        if image:
-            _, image_np = preprocess_image(image)
-            image_features = detect_image_content(image_np)
-        else:
-            # Default features if no image
-            image_features = {
-                'faces_detected': 0,
-                'edge_density': 0.0,
-                'brightness': 128.0,
-                'has_people': False,
-                'is_complex': False,
-                'top_predictions': []
-            }
-        
-        # Make moderation decision
-        decision = 'approved'
-        confidence = text_analysis['score']
-        
-        # Adjust decision based on sentiment
-        if text_analysis['label'] == 'NEGATIVE' and text_analysis['score'] > 0.8:
-            decision = 'rejected'
-            confidence = text_analysis['score']
-        elif text_analysis['label'] == 'POSITIVE' and text_analysis['score'] > 0.7:
-            decision = 'approved'
-            confidence = text_analysis['score']
+        data, image_bytes = read_analyze_request()
+        result = analyze_post(data.get('text', ''), image_bytes)
+        with timed_stage('encode'):
+            return jsonify(result)
+    
+    except Exception as e:
+        print(f"Error in analyze_content: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze a list of posts, sharing model passes across the whole list"""
+    try:
+        items = read_batch_request()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        initialize_models()
+    except Exception as e:
+        print(f"Error in analyze_batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    results = [None] * len(items)
+    entries = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            results[index] = {'error': item}
+            continue
+        fields, image_bytes = item
+        text = fields.get('text') or ''
+        if not isinstance(text, str):
+            results[index] = {'error': 'text must be a string'}
+            continue
+        try:
+            cache_key = content_key(image_bytes, text)
+            entries.append({
+                'index': index,
+                'text': text,
+                'image_bytes': image_bytes,
+                'cache_key': cache_key,
+                'cached': result_cache.get(cache_key)
+            })
+        except Exception as e:
+            print(f"Error in analyze_batch item {index}: {str(e)}")
+            results[index] = {'error': str(e)}
+    
+    # Queue every classifier input and image at once so the micro-batchers
+    # can fill whole batches; images are decoded and analyzed in parallel,
+    # each once its post's text shows the analysis is still needed
+    text_futures = {}
+    image_futures = {}
+    for entry in entries:
+        index = entry['index']
+        if entry['cached']:
+            continue
+        try:
+            if entry['text'].strip():
+                text_futures[index] = text_scorer.score_async(entry['text'])
+            image_futures[index] = batch_image_pool.submit(
+                analyze_image_after_text, entry['image_bytes'], text_futures.get(index)
+            )
+        except Exception as e:
+            print(f"Error in analyze_batch item {index}: {str(e)}")
+            results[index] = {'error': str(e)}
+    
+    for entry in entries:
+        index = entry['index']
+        if results[index] is not None:
+            continue
+        try:
+            if entry['cached']:
+                entry['text_analysis'] = entry['cached']['text_analysis']
+                entry['image_features'] = entry['cached']['image_features']
+            else:
+                entry['text_analysis'] = (
+                    text_futures[index].result() if index in text_futures
+                    else analyze_text_sentiment('')
+                )
+                entry['image_features'] = image_futures[index].result()
+            entry['skipped'] = skipped_stages(entry['text_analysis'])
+        except Exception as e:
+            print(f"Error in analyze_batch item {index}: {str(e)}")
+            results[index] = {'error': str(e)}
+    
+    # Captions for several posts are sampled in each generate call
+    needs_captions = [
+        entry for entry in entries
+        if results[entry['index']] is None
+        and 'captions' not in entry['skipped']
+        and not (entry['cached'] and entry['cached']['captions'] is not None)
+    ]
+    try:
+        contexts = [build_caption_context(entry['text'], entry['image_features']) for entry in needs_captions]
+        if contexts:
+            with cascade_stages.run('captions', count=len(contexts)), timed_stage('gpt2'):
+                generated = caption_engine.generate_many(contexts)
+            for entry, captions in zip(needs_captions, generated):
+                entry['captions'] = captions
+    except Exception as e:
+        print(f"Error generating batch captions: {str(e)}")
+        for entry in needs_captions:
+            results[entry['index']] = {'error': str(e)}
+    
+    for entry in entries:
+        index = entry['index']
+        if results[index] is not None:
+            continue
+        if 'captions' in entry['skipped']:
+            cascade_stages.skip('captions')
+            entry['captions'] = caption_engine.empty_captions()
+            if not entry['cached']:
+                cache_stage_results(entry['cache_key'], entry['text_analysis'], entry['image_features'], None)
+        elif 'captions' in entry:
+            cache_stage_results(entry['cache_key'], entry['text_analysis'], entry['image_features'], entry['captions'])
         else:
-            decision = 'approved'
-            confidence = 0.7
-        
-        # Generate platform-specific captions
-        captions = generate_platform_captions(text, image_features)
-        
-        # Generate hashtags
-        hashtags = generate_hashtags(text, captions)
-        
-        # Calculate insights
-        insights = {
-            'engagement_score': min(95, int(confidence * 100 + np.random.randint(-5, 15))),
-            'sentiment': text_analysis['label'],
-            'toxicity_level': 'Low' if decision == 'approved' else 'High',
-            'readability': 'High' if len(text) < 200 else 'Medium',
-            'visual_appeal': 'High' if image_features['is_complex'] else 'Medium',
-            'authenticity': f"{int(confidence * 100)}%"
-        }
-        
-        response = {
+            entry['captions'] = entry['cached']['captions']
+        results[index] = build_analysis_response(
+            entry['text'], entry['text_analysis'], entry['image_features'], entry['captions'], entry['skipped']
+        )
+    
+    with timed_stage('encode'):
+        return jsonify({'results': results})
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_content_stream():
+    """Stream analysis results as Server-Sent Events as each stage finishes"""
+    data, image_bytes = read_analyze_request()
+    text = data.get('text', '')
+    initialize_models()
+    
+    def stages():
+        # The moderation decision only needs the classifier
+        text_analysis = analyze_text_sentiment(text)
+        decision, confidence = make_moderation_decision(text_analysis)
+        skipped = skipped_stages(text_analysis)
+        yield 'moderation', {
             'decision': decision,
-            'confidence': float(confidence),
-            'captions': captions,
-            'hashtags': hashtags,
-            'insights': insights,
+            'confidence': confidence,
             'text_analysis': text_analysis,
-            'image_analysis': image_features
+            'skipped_stages': list(skipped)
         }
         
-        return jsonify(response)
+        image_features = analyze_image(image_bytes, skip='image_analysis' in skipped)
+        yield 'image_analysis', image_features
+        yield 'insights', build_insights(text, text_analysis, decision, confidence, image_features)
+        
+        if 'captions' in skipped:
+            cascade_stages.skip('captions')
+            return
+        
+        # One event per platform as soon as its captions are sampled
+        hashtags = generate_hashtags(text, None)
+        context = build_caption_context(text, image_features)
+        with cascade_stages.run('captions'):
+            for platform, captions in caption_engine.iter_platforms(context):
+                yield 'captions', {
+                    'platform': platform,
+                    'captions': captions,
+                    'hashtags': hashtags[platform]
+                }
     
-    except Exception as e:
-        print(f"Error in analyze_content: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    return event_stream(stages())
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue an analysis and return its job ID without waiting for it"""
+    return submit_analysis_job(job_queue)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a queued analysis, with its result once it is done"""
+    return job_status_response(job_queue, job_id)
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """Runtime statistics for the model batchers"""
+    return jsonify({
+        'batching': {
+            batcher.name: batcher.stats()
+            for batcher in (text_batcher, resnet_batcher)
+        },
+        'result_cache': result_cache.stats(),
+        'sentiment_cache': sentiment_cache.stats() if sentiment_cache else None,
+        'cascade': cascade_stages.stats(),
+        'image_decode': decode_stats(),
+        'jobs': job_queue.stats(),
+        'models': models.stats()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency, batching, decode and job histograms in Prometheus text format"""
+    return metrics_response([
+        histogram
+        for batcher in (text_batcher, resnet_batcher)
+        for histogram in (batcher.batch_sizes, batcher.queue_wait)
+    ] + [decode_time, job_queue.wait_time, job_queue.run_time])
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'models_loaded': text_classifier is not None
+        'ready': models.ready(),
+        'models_loaded': text_classifier is not None,
+        'inference_engine': active_engine
     })
 
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process is serving requests"""
+    return liveness_response()
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: 503 while models are still loading or warming"""
+    return readiness_response(models)
+
+startup_profile.mark('module imported')
+
 if __name__ == '__main__':
-    initialize_models()
+    if not FAST_STARTUP:
+        initialize_models()
+    # The debug reloader's watcher process never serves, so it runs no jobs
+    if not is_reloader_parent():
+        job_queue.start()
+    startup_profile.mark('app.run (socket about to listen)')
+    
+    def report_startup():
+        startup_profile.report(models)
+    
+    if FAST_STARTUP:
+        # Listen right away; /api/health/ready reports when the models are in.
+        # The debug reloader's watcher process never serves, so it loads nothing
+        if not is_reloader_parent():
+            models.warm_in_background(before=initialize_models, warmup=MODEL_WARMUP, on_done=report_startup)
+    elif MODEL_WARMUP:
+        models.warm_in_background(on_done=report_startup)
+    else:
+        report_startup()
     app.run(host='0.0.0.0', port=5000, debug=True)
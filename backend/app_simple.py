@@ -4,9 +4,15 @@ import random
 import os
 from datetime import datetime
 from database import db, User, init_db
+from sse import event_stream
+from request_timing import timed_stage, init_request_timing, metrics_response
+from uploads import read_analyze_request
+from result_cache import ResultCache, content_key
+from themes import detect_theme
 
 app = Flask(__name__)
 CORS(app)
+init_request_timing(app)
 
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
@@ -18,10 +24,12 @@ init_db(app)
 
 print("✅ Simple backend server starting (no ML models - using mock data)...")
 
+# Full responses keyed by decoded image bytes + normalized text
+result_cache = ResultCache('analysis')
+
 # Image content analysis patterns
 IMAGE_PATTERNS = {
     'sunset': {
-        'keywords': ['sunset', 'evening', 'dusk', 'golden hour', 'sky', 'orange', 'red', 'horizon'],
         'captions': {
             'instagram': [
                 "🌅 Chasing sunsets and dreams ✨ Every ending brings a new beginning",
@@ -58,7 +66,6 @@ IMAGE_PATTERNS = {
         }
     },
     'nature': {
-        'keywords': ['nature', 'trees', 'forest', 'mountains', 'landscape', 'outdoor', 'green', 'scenic'],
         'captions': {
             'instagram': [
                 "🌲 Lost in nature, found in peace 🍃 Where the wild things are",
@@ -95,7 +102,6 @@ IMAGE_PATTERNS = {
         }
     },
     'people': {
-        'keywords': ['people', 'person', 'face', 'portrait', 'selfie', 'group', 'friends', 'family'],
         'captions': {
             'instagram': [
                 "💫 Living my best life with the best people ✨ Creating memories that last forever",
@@ -132,7 +138,6 @@ IMAGE_PATTERNS = {
         }
     },
     'food': {
-        'keywords': ['food', 'meal', 'dinner', 'lunch', 'breakfast', 'cooking', 'restaurant', 'delicious'],
         'captions': {
             'instagram': [
                 "🍽️ Food is my love language 😋 Living for these delicious moments",
@@ -169,7 +174,6 @@ IMAGE_PATTERNS = {
         }
     },
     'default': {
-        'keywords': [],
         'captions': {
             'instagram': [
                 "✨ Living in the moment and loving every second 💫 What makes you smile today?",
@@ -207,29 +211,16 @@ IMAGE_PATTERNS = {
     }
 }
 
+# Keyword themes that have their own caption sets
+PATTERN_THEMES = tuple(name for name in IMAGE_PATTERNS if name != 'default')
+
 def analyze_image_content(image_data, text):
     """Analyze image content based on text keywords and return context"""
     if not image_data:
         return {'type': 'default'}
     
-    # Combine text for analysis
-    combined_text = text.lower()
-    
-    # Check for image content patterns
-    detected_patterns = []
-    for pattern_name, pattern_data in IMAGE_PATTERNS.items():
-        if pattern_name == 'default':
-            continue
-        # Check if any keywords match
-        for keyword in pattern_data['keywords']:
-            if keyword in combined_text:
-                detected_patterns.append(pattern_name)
-                break
-    
-    # Return the first detected pattern or default
-    if detected_patterns:
-        return {'type': detected_patterns[0]}
-    return {'type': 'default'}
+    # Return the highest-priority detected pattern or default
+    return {'type': detect_theme(text, themes=PATTERN_THEMES, default='default')}
 
 def generate_contextual_captions(text, image_context):
     """Generate captions based on image context"""
@@ -245,21 +236,65 @@ def generate_contextual_hashtags(image_context):
     
     return pattern['hashtags']
 
+def build_insights(has_image):
+    """Mock engagement insights for the response"""
+    return {
+        'engagement_score': random.randint(75, 95),
+        'sentiment': 'POSITIVE',
+        'toxicity_level': 'Low',
+        'readability': 'High',
+        'visual_appeal': 'High' if has_image else 'Medium',
+        'authenticity': f"{random.randint(80, 95)}%",
+        'best_time_to_post': random.choice([
+            '9:00 AM - 11:00 AM',
+            '12:00 PM - 1:00 PM', 
+            '7:00 PM - 9:00 PM',
+            '10:00 AM - 12:00 PM',
+            '6:00 PM - 8:00 PM'
+        ]),
+        'engagement_prediction': random.choice([
+            'High (85-95%)',
+            'Very High (90-98%)',
+            'Excellent (95%+)',
+            'Good (75-85%)',
+            'Strong (80-90%)'
+        ])
+    }
+
+def build_image_analysis(has_image):
+    """Mock image analysis section of the response"""
+    return {
+        'faces_detected': random.randint(0, 3) if has_image else 0,
+        'has_people': has_image and random.random() > 0.5,
+        'is_complex': has_image,
+        'brightness': round(random.uniform(120, 180), 1),
+        'edge_density': round(random.uniform(0.1, 0.25), 2),
+        'top_predictions': []
+    }
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_content():
     """Intelligent analysis endpoint - analyzes image content and generates relevant captions"""
     try:
-        data = request.json
+        data, image_bytes = read_analyze_request()
         text = data.get('text', '')
-        image_data = data.get('image', '')
-        has_image = bool(image_data)
+        has_image = image_bytes is not None
+        
+        # Resubmitted content gets the same answer back
+        cache_key = content_key(image_bytes, text)
+        cached = result_cache.get(cache_key)
+        if cached:
+            with timed_stage('encode'):
+                return jsonify(cached)
         
         # Analyze image content using keywords detection
-        image_context = analyze_image_content(image_data, text) if has_image else {}
+        with timed_stage('theme'):
+            image_context = analyze_image_content(image_bytes, text) if has_image else {}
         
         # Generate context-aware captions based on image analysis
-        captions = generate_contextual_captions(text, image_context)
-        hashtags = generate_contextual_hashtags(image_context)
+        with timed_stage('templates'):
+            captions = generate_contextual_captions(text, image_context)
+            hashtags = generate_contextual_hashtags(image_context)
         
         # Generate mock response
         response = {
@@ -267,48 +302,65 @@ def analyze_content():
             'confidence': round(random.uniform(0.75, 0.95), 2),
             'captions': captions,
             'hashtags': hashtags,
-            'insights': {
-                'engagement_score': random.randint(75, 95),
-                'sentiment': 'POSITIVE',
-                'toxicity_level': 'Low',
-                'readability': 'High',
-                'visual_appeal': 'High' if has_image else 'Medium',
-                'authenticity': f"{random.randint(80, 95)}%",
-                'best_time_to_post': random.choice([
-                    '9:00 AM - 11:00 AM',
-                    '12:00 PM - 1:00 PM', 
-                    '7:00 PM - 9:00 PM',
-                    '10:00 AM - 12:00 PM',
-                    '6:00 PM - 8:00 PM'
-                ]),
-                'engagement_prediction': random.choice([
-                    'High (85-95%)',
-                    'Very High (90-98%)',
-                    'Excellent (95%+)',
-                    'Good (75-85%)',
-                    'Strong (80-90%)'
-                ])
-            },
+            'insights': build_insights(has_image),
             'text_analysis': {
                 'label': 'POSITIVE',
                 'score': round(random.uniform(0.85, 0.98), 2)
             },
-            'image_analysis': {
-                'faces_detected': random.randint(0, 3) if has_image else 0,
-                'has_people': has_image and random.random() > 0.5,
-                'is_complex': has_image,
-                'brightness': round(random.uniform(120, 180), 1),
-                'edge_density': round(random.uniform(0.1, 0.25), 2),
-                'top_predictions': []
-            }
+            'image_analysis': build_image_analysis(has_image)
         }
         
-        return jsonify(response)
+        result_cache.put(cache_key, response)
+        with timed_stage('encode'):
+            return jsonify(response)
     
     except Exception as e:
         print(f"Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_content_stream():
+    """Stream analysis results as Server-Sent Events as each stage finishes"""
+    data, image_bytes = read_analyze_request()
+    text = data.get('text', '')
+    has_image = image_bytes is not None
+    
+    def stages():
+        yield 'moderation', {
+            'decision': 'approved' if random.random() > 0.2 else 'rejected',
+            'confidence': round(random.uniform(0.75, 0.95), 2),
+            'text_analysis': {
+                'label': 'POSITIVE',
+                'score': round(random.uniform(0.85, 0.98), 2)
+            }
+        }
+        yield 'image_analysis', build_image_analysis(has_image)
+        yield 'insights', build_insights(has_image)
+        
+        image_context = analyze_image_content(image_bytes, text) if has_image else {}
+        captions = generate_contextual_captions(text, image_context)
+        hashtags = generate_contextual_hashtags(image_context)
+        for platform in captions:
+            yield 'captions', {
+                'platform': platform,
+                'captions': captions[platform],
+                'hashtags': hashtags[platform]
+            }
+    
+    return event_stream(stages())
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """Runtime statistics for the analysis cache"""
+    return jsonify({
+        'result_cache': result_cache.stats()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage and request latency histograms in Prometheus text format"""
+    return metrics_response()
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
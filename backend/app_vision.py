@@ -1,18 +1,30 @@
+from startup import StartupProfile, FAST_STARTUP, is_reloader_parent
+startup_profile = StartupProfile('app_vision')
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import random
 import os
-import base64
-import io
 from datetime import datetime
 from database import db, User, init_db
 from PIL import Image
-import torch
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from transformers import pipeline
+from batching import MicroBatcher
+from sentiment import WindowedSentiment, make_sentiment_cache
+from sse import event_stream
+from image_io import open_image, decode_stats, decode_time
+from request_timing import timed_stage, init_request_timing, metrics_response
+from profiling import profiled
+from uploads import read_analyze_request
+from result_cache import ResultCache, content_key
+from perceptual_hash import PerceptualIndex, distinctive_dhash
+from themes import detect_theme
+from caption_store import image_digest, open_caption_store
+from job_queue import open_job_queue, submit_analysis_job, job_status_response
+from model_registry import ModelRegistry, MODEL_WARMUP, liveness_response, readiness_response
 
 app = Flask(__name__)
 CORS(app)
+init_request_timing(app)
 
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
@@ -26,27 +38,63 @@ print("🤖 Initializing Lightweight AI Vision system...")
 print("⚡ Using fast inference without pre-downloading models")
 
 # Initialize AI models on-demand (lazy loading)
+BLIP_MODEL_ID = "Salesforce/blip-image-captioning-base"
+SENTIMENT_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
 MODELS_LOADED = False
 blip_processor = None
 blip_model = None
 sentiment_analyzer = None
+sentiment_scorer = None
+
+# torch and transformers are imported by the loaders, not at startup
+def load_blip():
+    """BLIP for image captioning - lighter and faster than CLIP"""
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+    processor = BlipProcessor.from_pretrained(BLIP_MODEL_ID)
+    model = BlipForConditionalGeneration.from_pretrained(BLIP_MODEL_ID)
+    return processor, model
+
+def warm_blip(blip):
+    """Caption a blank image once"""
+    import torch
+    processor, model = blip
+    inputs = processor(images=[Image.new('RGB', (384, 384))], return_tensors="pt")
+    with torch.no_grad():
+        model.generate(**inputs, max_length=5)
+
+def load_sentiment():
+    """Sentiment analysis for text"""
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL_ID)
+
+def warm_sentiment(analyzer):
+    """Score a short text once"""
+    analyzer(["Warming up"])
+
+# Each model loads once however many requests arrive while it is loading
+models = ModelRegistry()
+models.register('blip', load_blip, warm_blip)
+models.register('sentiment', load_sentiment, warm_sentiment)
 
 def load_models_if_needed():
     """Load AI models only when first needed"""
-    global MODELS_LOADED, blip_processor, blip_model, sentiment_analyzer
+    global MODELS_LOADED, blip_processor, blip_model, sentiment_analyzer, sentiment_scorer
     
     if MODELS_LOADED:
         return True
     
     try:
-        print("📥 Loading AI models on first use...")
+        if not models.is_loaded('blip'):
+            print("📥 Loading AI models on first use...")
         
-        # BLIP for image captioning - lighter and faster than CLIP
-        blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-        blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+        blip_processor, blip_model = models.get('blip')
+        sentiment_analyzer = models.get('sentiment')
         
-        # Sentiment analysis for text
-        sentiment_analyzer = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+        # Long posts are scored in overlapping token windows, not cut at 512 chars
+        sentiment_scorer = WindowedSentiment(
+            sentiment_analyzer.tokenizer, sentiment_batcher,
+            cache=sentiment_cache, model_version=SENTIMENT_MODEL_ID
+        )
         
         MODELS_LOADED = True
         print("✅ AI models loaded successfully!")
@@ -58,23 +106,45 @@ def load_models_if_needed():
         print("📝 Using intelligent keyword-based analysis")
         return False
 
+def caption_image_batch(images):
+    """Caption a batch of PIL images with one BLIP generate call"""
+    import torch
+    inputs = blip_processor(images=images, return_tensors="pt")
+    
+    with torch.no_grad():
+        out = blip_model.generate(**inputs, max_length=50)
+    
+    return blip_processor.batch_decode(out, skip_special_tokens=True)
+
+def sentiment_batch(texts):
+    """Score a batch of texts with one DistilBERT forward pass"""
+    return sentiment_analyzer(texts, batch_size=len(texts))
+
+# Concurrent requests share one forward pass per model
+blip_batcher = MicroBatcher('blip', caption_image_batch)
+sentiment_batcher = MicroBatcher('sentiment', sentiment_batch)
+
+# Full responses keyed by decoded image bytes + normalized text
+result_cache = ResultCache('analysis')
+
+# DistilBERT results keyed by model version + normalized text
+sentiment_cache = make_sentiment_cache()
+
+# BLIP captions of earlier uploads, found again after re-encoding or resizing
+caption_index = PerceptualIndex('blip_captions')
+
+# BLIP captions persisted next to users.db, shared by every worker process
+caption_store = open_caption_store(app)
+for image_hash, caption in caption_store.warm(BLIP_MODEL_ID):
+    caption_index.add(image_hash, caption)
+
 print("✅ Smart AI system ready (models will load on first use)")
 
-def decode_base64_image(base64_string):
-    """Decode base64 image to PIL Image"""
+def decode_image(image_bytes):
+    """Decode uploaded image bytes to PIL Image"""
     try:
-        # Remove data URL prefix if present
-        if 'base64,' in base64_string:
-            base64_string = base64_string.split('base64,')[1]
-        
-        image_data = base64.b64decode(base64_string)
-        image = Image.open(io.BytesIO(image_data))
-        
-        # Convert to RGB if needed
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        return image
+        with timed_stage('decode'):
+            return open_image(image_bytes, stages=('blip', 'phash'))
     except Exception as e:
         print(f"Error decoding image: {str(e)}")
         return None
@@ -85,59 +155,52 @@ def generate_image_caption_ai(image):
         if not MODELS_LOADED or blip_model is None:
             return None
         
-        # Process image
-        inputs = blip_processor(image, return_tensors="pt")
-        
-        # Generate caption
-        with torch.no_grad():
-            out = blip_model.generate(**inputs, max_length=50)
-        
-        caption = blip_processor.decode(out[0], skip_special_tokens=True)
+        # Generate caption alongside any concurrent requests
+        with timed_stage('blip'):
+            caption = blip_batcher.submit(image)
         return caption
     except Exception as e:
         print(f"Error generating AI caption: {str(e)}")
         return None
 
+def caption_image_with_blip(image, digest):
+    """BLIP caption, reused from a visually identical earlier upload when possible"""
+    # Flat images get no hash: they would all look like near-duplicates
+    image_hash = distinctive_dhash(image)
+    caption = caption_index.lookup(image_hash) if image_hash is not None else None
+    if caption is not None:
+        print("♻️ Reusing BLIP caption of a near-duplicate image")
+    else:
+        caption = generate_image_caption_ai(image)
+        if not caption:
+            return caption
+        if image_hash is not None:
+            caption_index.add(image_hash, caption)
+    
+    caption_store.put(digest, BLIP_MODEL_ID, caption, phash=image_hash)
+    return caption
+
 def analyze_text_sentiment(text):
-    """Analyze sentiment of text using AI"""
+    """Analyze sentiment of text using AI, or None when the model cannot"""
     try:
-        if not MODELS_LOADED or sentiment_analyzer is None or not text:
-            return "POSITIVE", 0.85
+        if not MODELS_LOADED or sentiment_analyzer is None:
+            return None
         
-        result = sentiment_analyzer(text[:512])[0]  # Limit to 512 chars
+        with timed_stage('sentiment'):
+            result = sentiment_scorer.score(text)
         label = result['label']
         score = result['score']
         
         return label, score
     except Exception as e:
         print(f"Error analyzing sentiment: {str(e)}")
-        return "POSITIVE", 0.85
+        return None
 
 def generate_contextual_captions_from_description(description, sentiment="POSITIVE"):
     """Generate platform-specific captions based on AI image description"""
     
-    # Extract key themes from description
-    description_lower = description.lower()
-    
-    # Theme detection patterns
-    themes = {
-        'sunset': ['sunset', 'sun setting', 'dusk', 'twilight', 'orange sky', 'evening sky'],
-        'nature': ['tree', 'forest', 'mountain', 'landscape', 'outdoor', 'nature', 'plant', 'flower', 'garden'],
-        'ocean': ['ocean', 'sea', 'beach', 'water', 'wave', 'coast', 'shore'],
-        'city': ['city', 'building', 'urban', 'street', 'skyline', 'downtown', 'architecture'],
-        'food': ['food', 'plate', 'dish', 'meal', 'dining', 'restaurant', 'table with'],
-        'people': ['person', 'people', 'man', 'woman', 'child', 'group', 'crowd', 'face'],
-        'animal': ['dog', 'cat', 'bird', 'animal', 'pet', 'horse', 'wildlife'],
-        'indoor': ['room', 'indoor', 'inside', 'interior', 'living room', 'bedroom', 'office'],
-        'sports': ['sport', 'playing', 'game', 'ball', 'field', 'court', 'athlete'],
-        'travel': ['travel', 'vacation', 'trip', 'destination', 'adventure', 'explore']
-    }
-    
-    detected_theme = 'general'
-    for theme, keywords in themes.items():
-        if any(keyword in description_lower for keyword in keywords):
-            detected_theme = theme
-            break
+    # Extract key theme from description
+    detected_theme = detect_theme(description)
     
     # Generate captions based on theme and description
     captions = {
@@ -264,12 +327,14 @@ def generate_contextual_captions_from_description(description, sentiment="POSITI
     
     return captions
 
+# Themes with their own hashtag sets; anything else gets the default set
+HASHTAG_THEMES = ('sunset', 'nature', 'ocean', 'food', 'people')
+
 def generate_hashtags_from_theme(description):
     """Generate relevant hashtags based on image description"""
-    description_lower = description.lower()
-    
     # Detect themes for hashtags
-    if any(word in description_lower for word in ['sunset', 'sun setting', 'dusk', 'twilight', 'orange sky']):
+    theme = detect_theme(description, themes=HASHTAG_THEMES)
+    if theme == 'sunset':
         return {
             'instagram': [
                 ['#sunset', '#sunsetlovers', '#goldenhour', '#naturephotography', '#skyporn'],
@@ -287,7 +352,7 @@ def generate_hashtags_from_theme(description):
                 ['#ProfessionalGrowth', '#Gratitude', '#LeadershipLessons', '#CareerDevelopment', '#Wisdom']
             ]
         }
-    elif any(word in description_lower for word in ['tree', 'forest', 'mountain', 'nature', 'plant', 'landscape']):
+    elif theme == 'nature':
         return {
             'instagram': [
                 ['#nature', '#naturelover', '#outdoors', '#naturephotography', '#wilderness'],
@@ -305,7 +370,7 @@ def generate_hashtags_from_theme(description):
                 ['#StrategicThinking', '#Creativity', '#Innovation', '#GrowthMindset', '#Performance']
             ]
         }
-    elif any(word in description_lower for word in ['ocean', 'sea', 'beach', 'water', 'wave']):
+    elif theme == 'ocean':
         return {
             'instagram': [
                 ['#ocean', '#beach', '#sea', '#beachlife', '#oceanlover'],
@@ -323,7 +388,7 @@ def generate_hashtags_from_theme(description):
                 ['#StrategicThinking', '#Leadership', '#ProfessionalDevelopment', '#Balance', '#Clarity']
             ]
         }
-    elif any(word in description_lower for word in ['food', 'plate', 'dish', 'meal', 'dining']):
+    elif theme == 'food':
         return {
             'instagram': [
                 ['#foodie', '#foodporn', '#delicious', '#foodstagram', '#yummy'],
@@ -341,7 +406,7 @@ def generate_hashtags_from_theme(description):
                 ['#CorporateCulture', '#TeamBuilding', '#BusinessEtiquette', '#Collaboration', '#Leadership']
             ]
         }
-    elif any(word in description_lower for word in ['person', 'people', 'man', 'woman', 'group']):
+    elif theme == 'people':
         return {
             'instagram': [
                 ['#friends', '#friendship', '#goodvibes', '#memories', '#blessed'],
@@ -378,102 +443,233 @@ def generate_hashtags_from_theme(description):
             ]
         }
 
+def describe_image(image_bytes):
+    """Describe an uploaded image with BLIP, falling back to a generic scene
+
+    Returns ``(description, degraded)``; ``degraded`` is True for the fallback.
+    """
+    # Captions of earlier uploads survive restarts, so no model is needed
+    digest = image_digest(image_bytes)
+    stored = caption_store.get(digest, BLIP_MODEL_ID)
+    if stored is not None:
+        print(f"♻️ Reusing stored BLIP caption: {stored}")
+        return stored, False
+    
+    # Try to load models if not already loaded
+    if not MODELS_LOADED:
+        load_models_if_needed()
+    
+    # Analyze image with AI if available
+    if MODELS_LOADED:
+        print("🎨 Analyzing image with AI...")
+        image = decode_image(image_bytes)
+        if image:
+            ai_caption = caption_image_with_blip(image, digest)
+            if ai_caption:
+                print(f"🤖 AI detected: {ai_caption}")
+                return ai_caption, False
+    
+    return "a beautiful scene", True
+
+def score_text(text):
+    """Sentiment label, score and whether the fallback score was used"""
+    if not text:
+        return "POSITIVE", 0.85, False
+    
+    if not MODELS_LOADED:
+        load_models_if_needed()
+    result = analyze_text_sentiment(text)
+    if result is None:
+        return "POSITIVE", 0.85, True
+    
+    sentiment_label, sentiment_score = result
+    print(f"💬 Text sentiment: {sentiment_label} ({sentiment_score:.2f})")
+    return sentiment_label, sentiment_score, False
+
+def build_moderation():
+    """Moderation decision and confidence"""
+    return {
+        'decision': 'approved' if random.random() > 0.2 else 'rejected',
+        'confidence': round(random.uniform(0.75, 0.95), 2)
+    }
+
+def build_insights(sentiment_label, has_image):
+    """Engagement insights for the response"""
+    return {
+        'engagement_score': random.randint(75, 95),
+        'sentiment': sentiment_label,
+        'toxicity_level': 'Low',
+        'readability': 'High',
+        'visual_appeal': 'High' if has_image else 'Medium',
+        'authenticity': f"{random.randint(80, 95)}%",
+        'best_time_to_post': random.choice([
+            '9:00 AM - 11:00 AM',
+            '12:00 PM - 1:00 PM', 
+            '7:00 PM - 9:00 PM',
+            '10:00 AM - 12:00 PM',
+            '6:00 PM - 8:00 PM'
+        ]),
+        'engagement_prediction': random.choice([
+            'High (85-95%)',
+            'Very High (90-98%)',
+            'Excellent (95%+)',
+            'Good (75-85%)',
+            'Strong (80-90%)'
+        ])
+    }
+
+def build_image_analysis(image_description, has_image):
+    """Image analysis section of the response"""
+    return {
+        'description': image_description,
+        'ai_generated': MODELS_LOADED and has_image,
+        'faces_detected': random.randint(0, 3) if has_image else 0,
+        'has_people': 'person' in image_description.lower() or 'people' in image_description.lower(),
+        'is_complex': has_image,
+        'brightness': round(random.uniform(120, 180), 1),
+        'edge_density': round(random.uniform(0.1, 0.25), 2),
+        'top_predictions': []
+    }
+
+def analyze_post(text, image_bytes):
+    """Full analysis of one post, served from the result cache when possible"""
+    has_image = image_bytes is not None
+    
+    # Resubmitted content skips BLIP and sentiment entirely
+    cache_key = content_key(image_bytes, text)
+    cached = result_cache.get(cache_key)
+    if cached:
+        return cached
+    
+    # Analyze image with AI if available
+    image_description, image_degraded = describe_image(image_bytes) if has_image else ("a beautiful scene", False)
+    
+    # Analyze text sentiment  
+    sentiment_label, sentiment_score, text_degraded = score_text(text)
+    
+    # Generate captions based on AI image understanding
+    with timed_stage('templates'):
+        captions = generate_contextual_captions_from_description(image_description, sentiment_label)
+        hashtags = generate_hashtags_from_theme(image_description)
+    
+    # Generate response
+    response = {
+        **build_moderation(),
+        'captions': captions,
+        'hashtags': hashtags,
+        'insights': build_insights(sentiment_label, has_image),
+        'text_analysis': {
+            'label': sentiment_label,
+            'score': round(sentiment_score, 2)
+        },
+        'image_analysis': build_image_analysis(image_description, has_image)
+    }
+    
+    # Fallback results are not cached, so the models answer once they recover
+    if image_degraded or text_degraded:
+        print("⚠️ Not caching fallback analysis")
+    else:
+        result_cache.put(cache_key, response)
+    return response
+
+def run_analysis_job(fields, image_bytes):
+    """Job queue handler: the same analysis as /api/analyze"""
+    return analyze_post(fields.get('text', ''), image_bytes)
+
+# BLIP captioning can be queued instead of holding the request open
+job_queue = open_job_queue(app, run_analysis_job)
+
 @app.route('/api/analyze', methods=['POST'])
+@profiled
 def analyze_content():
     """AI-powered analysis endpoint with real image understanding"""
     try:
-        data = request.json
-        text = data.get('text', '')
-        image_data = data.get('image', '')
-        has_image = bool(image_data)
-        
-        # Default values
-        image_description = "a beautiful scene"
-        sentiment_label = "POSITIVE"
-        sentiment_score = 0.85
-        
-        # Try to load models if not already loaded
-        if has_image and not MODELS_LOADED:
-            load_models_if_needed()
-        
-        # Analyze image with AI if available
-        if has_image and MODELS_LOADED:
-            print("🎨 Analyzing image with AI...")
-            image = decode_base64_image(image_data)
-            if image:
-                ai_caption = generate_image_caption_ai(image)
-                if ai_caption:
-                    image_description = ai_caption
-                    print(f"🤖 AI detected: {image_description}")
-        
-        # Analyze text sentiment  
-        if text:
-            if not MODELS_LOADED:
-                load_models_if_needed()
-            sentiment_label, sentiment_score = analyze_text_sentiment(text)
-            print(f"💬 Text sentiment: {sentiment_label} ({sentiment_score:.2f})")
-        
-        # Generate captions based on AI image understanding
-        captions = generate_contextual_captions_from_description(image_description, sentiment_label)
-        hashtags = generate_hashtags_from_theme(image_description)
-        
-        # Generate response
-        response = {
-            'decision': 'approved' if random.random() > 0.2 else 'rejected',
-            'confidence': round(random.uniform(0.75, 0.95), 2),
-            'captions': captions,
-            'hashtags': hashtags,
-            'insights': {
-                'engagement_score': random.randint(75, 95),
-                'sentiment': sentiment_label,
-                'toxicity_level': 'Low',
-                'readability': 'High',
-                'visual_appeal': 'High' if has_image else 'Medium',
-                'authenticity': f"{random.randint(80, 95)}%",
-                'best_time_to_post': random.choice([
-                    '9:00 AM - 11:00 AM',
-                    '12:00 PM - 1:00 PM', 
-                    '7:00 PM - 9:00 PM',
-                    '10:00 AM - 12:00 PM',
-                    '6:00 PM - 8:00 PM'
-                ]),
-                'engagement_prediction': random.choice([
-                    'High (85-95%)',
-                    'Very High (90-98%)',
-                    'Excellent (95%+)',
-                    'Good (75-85%)',
-                    'Strong (80-90%)'
-                ])
-            },
+        data, image_bytes = read_analyze_request()
+        result = analyze_post(data.get('text', ''), image_bytes)
+        with timed_stage('encode'):
+            return jsonify(result)
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_content_stream():
+    """Stream analysis results as Server-Sent Events as each stage finishes"""
+    data, image_bytes = read_analyze_request()
+    text = data.get('text', '')
+    has_image = image_bytes is not None
+    
+    def stages():
+        # Text sentiment is far cheaper than BLIP, so it goes out first
+        sentiment_label, sentiment_score, _ = score_text(text)
+        yield 'moderation', {
+            **build_moderation(),
             'text_analysis': {
                 'label': sentiment_label,
                 'score': round(sentiment_score, 2)
-            },
-            'image_analysis': {
-                'description': image_description,
-                'ai_generated': MODELS_LOADED and has_image,
-                'faces_detected': random.randint(0, 3) if has_image else 0,
-                'has_people': 'person' in image_description.lower() or 'people' in image_description.lower(),
-                'is_complex': has_image,
-                'brightness': round(random.uniform(120, 180), 1),
-                'edge_density': round(random.uniform(0.1, 0.25), 2),
-                'top_predictions': []
             }
         }
         
-        return jsonify(response)
+        image_description, _ = describe_image(image_bytes) if has_image else ("a beautiful scene", False)
+        yield 'image_analysis', build_image_analysis(image_description, has_image)
+        yield 'insights', build_insights(sentiment_label, has_image)
+        
+        captions = generate_contextual_captions_from_description(image_description, sentiment_label)
+        hashtags = generate_hashtags_from_theme(image_description)
+        for platform in captions:
+            yield 'captions', {
+                'platform': platform,
+                'captions': captions[platform],
+                'hashtags': hashtags[platform]
+            }
     
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+    return event_stream(stages())
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue an analysis and return its job ID without waiting for it"""
+    return submit_analysis_job(job_queue)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a queued analysis, with its result once it is done"""
+    return job_status_response(job_queue, job_id)
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """Runtime statistics for the model batchers"""
+    return jsonify({
+        'batching': {
+            batcher.name: batcher.stats()
+            for batcher in (blip_batcher, sentiment_batcher)
+        },
+        'result_cache': result_cache.stats(),
+        'sentiment_cache': sentiment_cache.stats() if sentiment_cache else None,
+        'near_duplicate_index': caption_index.stats(),
+        'caption_store': caption_store.stats(),
+        'image_decode': decode_stats(),
+        'jobs': job_queue.stats(),
+        'models': models.stats()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency, batching, decode and job histograms in Prometheus text format"""
+    return metrics_response([
+        histogram
+        for batcher in (blip_batcher, sentiment_batcher)
+        for histogram in (batcher.batch_sizes, batcher.queue_wait)
+    ] + [decode_time, job_queue.wait_time, job_queue.run_time])
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
+        'ready': models.ready(),
         'models_loaded': MODELS_LOADED,
         'mode': 'AI-powered' if MODELS_LOADED else 'keyword-based',
         'models': {
@@ -482,6 +678,16 @@ def health_check():
         }
     })
 
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process is serving requests"""
+    return liveness_response()
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: 503 while models are still loading or warming"""
+    return readiness_response(models)
+
 @app.route('/api/auth/signup', methods=['POST'])
 def signup():
     """User registration endpoint"""
@@ -557,9 +763,25 @@ def get_users():
         print(f"Error fetching users: {str(e)}")
         return jsonify({'error': 'Failed to fetch users'}), 500
 
+startup_profile.mark('module imported')
+
 if __name__ == '__main__':
     print("🚀 AI Vision Backend Server Ready!")
     print("📍 Running on http://localhost:5000")
     print("🤖 Image Analysis:", "ENABLED" if MODELS_LOADED else "FALLBACK MODE")
     print("⚡ Ready to analyze images!")
+    # The debug reloader's watcher process never serves, so it runs no jobs
+    if not is_reloader_parent():
+        job_queue.start()
+    startup_profile.mark('app.run (socket about to listen)')
+    
+    # Models otherwise load on first use. The debug reloader's watcher
+    # process never serves, so it loads nothing
+    if (FAST_STARTUP or MODEL_WARMUP) and not is_reloader_parent():
+        models.warm_in_background(
+            before=load_models_if_needed, warmup=MODEL_WARMUP,
+            on_done=lambda: startup_profile.report(models)
+        )
+    elif not is_reloader_parent():
+        startup_profile.report(models)
     app.run(host='0.0.0.0', port=5000, debug=True)
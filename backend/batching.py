@@ -0,0 +1,113 @@
+"""
+Cross-request micro-batching for model inference
+
+Concurrent Flask threads submit single inputs; a per-model worker thread
+collects them until either the batch is full or the oldest input has waited
+``max_wait_ms``, runs one batched forward pass and hands every caller its own
+result.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import Histogram
+
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '16'))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', '5'))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class MicroBatcher:
+    """Queue inputs for one model and run them through ``batch_fn`` together
+
+    ``batch_fn`` receives a list of inputs and must return a list of results
+    of the same length and order.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=None, max_wait_ms=None):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size or BATCH_MAX_SIZE)
+        self.max_wait = (BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self.batch_sizes = Histogram(f'{name}_batch_size', BATCH_SIZE_BUCKETS, unit='items')
+        self.queue_wait = Histogram(f'{name}_queue_wait', QUEUE_WAIT_BUCKETS, unit='ms')
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, item):
+        """Queue one input and block until its result is ready"""
+        return self.submit_async(item).result()
+
+    def submit_async(self, item):
+        """Queue one input and return a Future for its result"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _ensure_worker(self):
+        # Started lazily so the thread is created in the process that serves requests
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f'batcher-{self.name}', daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self):
+        first = self._queue.get()
+        pending = [first]
+        deadline = first[2] + self.max_wait
+
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    pending.append(self._queue.get_nowait())
+                else:
+                    pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            started = time.perf_counter()
+
+            self.batch_sizes.observe(len(pending))
+            for _, _, enqueued in pending:
+                self.queue_wait.observe((started - enqueued) * 1000.0)
+
+            items = [item for item, _, _ in pending]
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} batch returned {len(results)} results for {len(items)} inputs"
+                    )
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(pending, results):
+                future.set_result(result)
+
+    def stats(self):
+        """Return configuration and histograms for this batcher"""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'queue_depth': self._queue.qsize(),
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait_ms': self.queue_wait.snapshot()
+        }
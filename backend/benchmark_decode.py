@@ -0,0 +1,91 @@
+"""
+Compare full and stage-sized JPEG decoding of a phone-sized photo
+Run from the backend directory: python benchmark_decode.py
+
+Each mode runs in a fresh interpreter so peak RSS reflects that decode
+alone rather than whatever earlier modes left on the heap.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMAGE_SIZE = (4032, 3024)
+REPEATS = 5
+
+MODES = {
+    'full': [],
+    'colors': ['colors'],
+    'resnet': ['resnet'],
+    'blip': ['blip'],
+    'faces + edges + resnet': ['faces', 'edges', 'resnet'],
+}
+
+def make_photo(path):
+    """Smooth gradient plus noise, saved like a phone camera JPEG"""
+    import numpy as np
+    from PIL import Image
+
+    width, height = IMAGE_SIZE
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = np.random.normal(0, 12, base.shape)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    Image.fromarray(pixels).save(path, format='JPEG', quality=92)
+
+def run_child(path, stages):
+    """Decode ``path`` REPEATS times for ``stages`` and print one JSON line"""
+    from image_io import open_image, peak_rss_mb
+
+    with open(path, 'rb') as handle:
+        image_bytes = handle.read()
+
+    baseline = peak_rss_mb()
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        image = open_image(image_bytes, stages=stages or None)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(json.dumps({
+        'size': f"{image.size[0]}x{image.size[1]}",
+        'ms': statistics.median(timings),
+        'rss': peak_rss_mb(),
+        'baseline': baseline
+    }))
+
+def measure(path, stages):
+    """Run one mode in a subprocess and parse its result line"""
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', path, ','.join(stages)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], [s for s in sys.argv[3].split(',') if s])
+        sys.exit(0)
+
+    print("=" * 72)
+    print(f"JPEG DECODE BENCHMARK ({IMAGE_SIZE[0]}x{IMAGE_SIZE[1]})")
+    print("=" * 72)
+    print(f"{'mode':>15} {'decoded':>11} {'decode ms':>10} {'peak RSS MB':>12} {'+ decode MB':>12}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'photo.jpg')
+        make_photo(path)
+
+        for name, stages in MODES.items():
+            result = measure(path, stages)
+            rss = result['rss']
+            if rss is None:
+                rss_text = growth_text = 'n/a'
+            else:
+                rss_text = f"{rss:.1f}"
+                growth_text = f"{rss - result['baseline']:.1f}"
+            print(f"{name:>15} {result['size']:>11} {result['ms']:>10.1f} {rss_text:>12} {growth_text:>12}")
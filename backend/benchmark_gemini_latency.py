@@ -0,0 +1,77 @@
+"""
+Tail latency of Gemini captioning with and without the latency budget
+Run from the backend directory: python benchmark_gemini_latency.py
+
+Starts gemini_stub_server in-process with a heavy tail (a few percent of
+calls take seconds) and compares p50/p95/p99 of:
+- the plain blocking call
+- a deadline only
+- a deadline plus one hedged attempt after the recent p95 latency
+
+Requests that miss the deadline fall back to color analysis in the app, so
+their latency is the deadline and they are counted as fallbacks.
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_stub_server import LatencyProfile, StubGenerativeModel, start_stub_server
+from latency_budget import DeadlineExceeded, HedgedCaller
+
+REQUESTS = 300
+CONCURRENCY = 8
+DEADLINE_MS = 1000
+PROFILE = LatencyProfile(latency_ms=200, jitter_ms=80, tail_ms=3000, tail_fraction=0.05)
+IMAGE_PART = {'mime_type': 'image/jpeg', 'data': b'\xff' * 50_000}
+
+def request_caption(model):
+    return model.generate_content(['Describe this image', IMAGE_PART]).text
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+def run(call):
+    """Per-request latency in ms and the number of fallbacks"""
+    def one(_):
+        started = time.perf_counter()
+        try:
+            call()
+            missed = False
+        except DeadlineExceeded:
+            missed = True
+        return (time.perf_counter() - started) * 1000, missed
+
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        results = list(pool.map(one, range(REQUESTS)))
+    return [latency for latency, _ in results], sum(missed for _, missed in results)
+
+if __name__ == "__main__":
+    server, url = start_stub_server(PROFILE)
+    model = StubGenerativeModel(url)
+
+    print("=" * 72)
+    print("GEMINI LATENCY BUDGET BENCHMARK")
+    print(f"stub: {PROFILE.latency_ms:.0f}±{PROFILE.jitter_ms:.0f} ms, "
+          f"{PROFILE.tail_fraction:.0%} at {PROFILE.tail_ms:.0f} ms; deadline {DEADLINE_MS} ms")
+    print("=" * 72)
+    print(f"{'mode':>18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fallbacks':>10} {'hedges':>7}")
+
+    modes = {
+        'blocking': (None, None),
+        'deadline': (DEADLINE_MS, 0),
+        'deadline + hedge': (DEADLINE_MS, 95),
+    }
+    for name, (deadline, hedge) in modes.items():
+        if deadline is None:
+            caller = None
+            latencies, fallbacks = run(lambda: request_caption(model))
+        else:
+            caller = HedgedCaller(name, request_caption, deadline_ms=deadline,
+                                  hedge_percentile=hedge, max_workers=CONCURRENCY * 2)
+            latencies, fallbacks = run(lambda: caller.call(model))
+        hedges = caller.stats()['hedges'] if caller else 0
+        print(f"{name:>18} {statistics.median(latencies):>8.0f} {percentile(latencies, 95):>8.0f} "
+              f"{percentile(latencies, 99):>8.0f} {fallbacks:>10} {hedges:>7}")
+
+    server.shutdown()
@@ -0,0 +1,63 @@
+"""
+Payload size and caption latency of Gemini uploads at several resolutions
+Run from the backend directory: python benchmark_gemini_payload.py
+
+Sends a phone-sized photo to gemini_stub_server with a simulated uplink,
+once at full size and once per GEMINI_MAX_SIDE setting, and reports the
+encoded payload, the time spent downscaling + encoding, and the caption
+round trip.
+"""
+import io
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+from gemini_stub_server import LatencyProfile, StubGenerativeModel, start_stub_server
+from image_io import encode_jpeg_blob
+
+IMAGE_SIZE = (4032, 3024)
+MAX_SIDES = [None, 2048, 1536, 1024, 768, 512]
+QUALITY = 85
+REPEATS = 5
+PROFILE = LatencyProfile(latency_ms=250, jitter_ms=0, uplink_mbps=20)
+
+def make_photo():
+    """Smooth gradient plus noise, closer to a real photo than pure noise"""
+    width, height = IMAGE_SIZE
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels = np.clip(base + np.random.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels)
+
+if __name__ == "__main__":
+    server, url = start_stub_server(PROFILE)
+    model = StubGenerativeModel(url)
+    photo = make_photo()
+
+    print("=" * 72)
+    print(f"GEMINI PAYLOAD BENCHMARK ({IMAGE_SIZE[0]}x{IMAGE_SIZE[1]}, "
+          f"{PROFILE.uplink_mbps:.0f} Mbps uplink, JPEG q{QUALITY})")
+    print("=" * 72)
+    print(f"{'max side':>9} {'sent':>11} {'payload KB':>11} {'encode ms':>10} {'caption ms':>11}")
+
+    for max_side in MAX_SIDES:
+        encode_times = []
+        round_trips = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            blob = encode_jpeg_blob(photo, max_side, QUALITY)
+            encoded = time.perf_counter()
+            model.generate_content(['Describe this image', blob])
+            finished = time.perf_counter()
+            encode_times.append((encoded - started) * 1000)
+            round_trips.append((finished - encoded) * 1000)
+
+        sent = Image.open(io.BytesIO(blob['data'])).size
+        label = str(max_side) if max_side else 'full'
+        print(f"{label:>9} {f'{sent[0]}x{sent[1]}':>11} {len(blob['data']) / 1024:>11.0f} "
+              f"{statistics.median(encode_times):>10.1f} {statistics.median(round_trips):>11.0f}")
+
+    server.shutdown()
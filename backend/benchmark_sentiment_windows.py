@@ -0,0 +1,64 @@
+"""
+Latency and coverage of windowed sentiment scoring versus post length
+Run from the backend directory: python benchmark_sentiment_windows.py
+
+Compares the old ``text[:512]`` character cut with the sliding-window
+scorer (both through a MicroBatcher, as the servers use them) for posts up
+to 10k characters. ``cut covers`` is the share of each post's tokens the
+character cut lets the model see; the windows cover all of them.
+"""
+import statistics
+import time
+
+import torch
+from transformers import pipeline
+
+from batching import MicroBatcher
+from sentiment import WindowedSentiment
+
+TEXT_LENGTHS = [100, 500, 1000, 2500, 5000, 10000]
+REPEATS = 5
+SAMPLE_TEXT = (
+    "Spent the weekend hiking through the mountains with friends, watching the "
+    "sunset over the lake and cooking dinner by the campfire under the stars. "
+)
+
+def build_text(length):
+    return (SAMPLE_TEXT * (length // len(SAMPLE_TEXT) + 1))[:length]
+
+def median_ms(fn, text):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(text)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+if __name__ == "__main__":
+    torch.set_grad_enabled(False)
+    classifier = pipeline("text-classification", model="distilbert-base-uncased-finetuned-sst-2-english")
+    tokenizer = classifier.tokenizer
+    batcher = MicroBatcher('benchmark', lambda texts: classifier(texts, batch_size=len(texts)))
+    scorer = WindowedSentiment(tokenizer, batcher)
+
+    def truncated(text):
+        return batcher.submit(text[:512])
+
+    # Warm up kernels and tokenizer caches
+    scorer.score(build_text(2000))
+
+    print("=" * 72)
+    print(f"WINDOWED SENTIMENT BENCHMARK (window {scorer.window_tokens} tokens, "
+          f"overlap {scorer.overlap}, {scorer.aggregation})")
+    print("=" * 72)
+    print(f"{'chars':>6} {'tokens':>7} {'cut covers':>11} {'cut ms':>8} "
+          f"{'windows':>8} {'windowed ms':>12}")
+
+    for length in TEXT_LENGTHS:
+        text = build_text(length)
+        tokens = len(tokenizer(text, add_special_tokens=False)['input_ids'])
+        cut_tokens = min(len(tokenizer(text[:512], add_special_tokens=False)['input_ids']), 510)
+        windows = len(scorer.windows(text))
+
+        print(f"{length:>6} {tokens:>7} {cut_tokens / tokens:>10.0%} {median_ms(truncated, text):>8.1f} "
+              f"{windows:>8} {median_ms(scorer.score, text):>12.1f}")
@@ -0,0 +1,128 @@
+"""
+Throughput and memory of serve.py at several worker counts
+Run from the backend directory: python benchmark_serve.py [--app app] [--workers 1 2 4]
+
+Starts ``serve.py`` once per worker count, sends a fixed number of
+concurrent /api/analyze requests with unique texts (so the result cache
+never answers them) and reports requests per second, latency percentiles
+and worker memory. On Linux, PSS (proportional set size) splits shared
+pages between the processes that map them, so a PSS total well below the
+RSS total shows the model weights are shared rather than copied.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PORT = 5077
+STARTUP_TIMEOUT_SECONDS = 600
+
+
+def post_analyze(index):
+    body = json.dumps({'text': f"Golden hour at the beach with friends, take {index}"}).encode('utf-8')
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{PORT}/api/analyze", data=body,
+        headers={'Content-Type': 'application/json'}
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def wait_until_ready(process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('serve.py exited during startup')
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError('serve.py did not start in time')
+
+
+def worker_pids(parent_pid):
+    """Child PIDs from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{parent_pid}/task/{parent_pid}/children") as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_mb(pid):
+    """``(rss, pss)`` in MB from /proc/<pid>/smaps_rollup, or Nones"""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in ('Rss', 'Pss'):
+                    values[name] = int(rest.split()[0]) / 1024
+    except OSError:
+        pass
+    return values.get('Rss'), values.get('Pss')
+
+
+def run(app, workers, requests, clients):
+    process = subprocess.Popen(
+        [sys.executable, 'serve.py', app, '--workers', str(workers), '--host', '127.0.0.1', '--port', str(PORT)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(process)
+        # Warm-up round so the workers have run their models before timing
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(post_analyze, range(-clients, 0)))
+
+            started = time.perf_counter()
+            latencies = sorted(pool.map(post_analyze, range(requests)))
+            elapsed = time.perf_counter() - started
+
+        memory = [memory_mb(pid) for pid in [process.pid] + worker_pids(process.pid)]
+        rss = [value for value, _ in memory if value is not None]
+        pss = [value for _, value in memory if value is not None]
+        return {
+            'throughput': requests / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[int(len(latencies) * 0.95) - 1],
+            'rss': sum(rss) if rss else None,
+            'pss': sum(pss) if pss else None
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--app', default='app')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=8)
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 72)
+    print(f"PRE-FORK SERVING BENCHMARK ({args.app}, {args.requests} requests, "
+          f"{args.clients} clients, {os.cpu_count()} cores)")
+    print("=" * 72)
+    print(f"{'workers':>8} {'req/s':>8} {'speedup':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'RSS MB':>9} {'PSS MB':>9}")
+
+    baseline = None
+    for workers in args.workers:
+        result = run(args.app, workers, args.requests, args.clients)
+        baseline = baseline or result['throughput']
+        rss = f"{result['rss']:.0f}" if result['rss'] is not None else 'n/a'
+        pss = f"{result['pss']:.0f}" if result['pss'] is not None else 'n/a'
+        print(f"{workers:>8} {result['throughput']:>8.2f} {result['throughput'] / baseline:>7.2f}x "
+              f"{result['p50']:>9.0f} {result['p95']:>9.0f} {rss:>9} {pss:>9}")
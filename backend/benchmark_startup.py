@@ -0,0 +1,104 @@
+"""
+Time to listening socket and time to ready, with and without FAST_STARTUP
+Run from the backend directory: python benchmark_startup.py
+
+First measures what each heavy library costs to import on its own (each in
+a fresh interpreter), then starts app.py and app_vision.py as a user would
+(``python app.py``, debug reloader included) in each startup mode. For
+each run it reports when port 5000 first accepts a connection and when
+/api/health/ready first answers 200. Set STARTUP_REPORT=1 to also see each
+server's own breakdown.
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+PORT = 5000
+TIMEOUT_SECONDS = 900
+HEAVY_MODULES = ['torch', 'transformers', 'cv2', 'torchvision']
+
+RUNS = [
+    ('app.py', {'FAST_STARTUP': '0'}),
+    ('app.py', {'FAST_STARTUP': '1'}),
+    ('app_vision.py', {'FAST_STARTUP': '0'}),
+    ('app_vision.py', {'FAST_STARTUP': '1'}),
+]
+
+
+def import_seconds(module):
+    """Import time of one module in a fresh interpreter, or None if missing"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    return float(result.stdout.strip()) if result.returncode == 0 else None
+
+
+def port_open():
+    with socket.socket() as sock:
+        sock.settimeout(0.2)
+        return sock.connect_ex(('127.0.0.1', PORT)) == 0
+
+
+def is_ready():
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/health/ready", timeout=2) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def measure(script, env):
+    """Seconds until the port accepts connections and until the app is ready"""
+    process = subprocess.Popen(
+        [sys.executable, script], env=dict(os.environ, **env),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=hasattr(os, 'killpg')
+    )
+    started = time.perf_counter()
+    listening = ready = None
+    try:
+        while time.perf_counter() - started < TIMEOUT_SECONDS:
+            if process.poll() is not None:
+                break
+            if listening is None and port_open():
+                listening = time.perf_counter() - started
+            if listening is not None and is_ready():
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.02)
+    finally:
+        # The debug reloader runs the server in a child process
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait()
+    return listening, ready
+
+
+def fmt(seconds):
+    return f"{seconds:.2f}" if seconds is not None else 'n/a'
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    print("=" * 60)
+    print("STARTUP BENCHMARK")
+    print("=" * 60)
+    print(f"{'module':<14} {'import s':>10}")
+    for module in HEAVY_MODULES:
+        print(f"{module:<14} {fmt(import_seconds(module)):>10}")
+
+    print()
+    print(f"{'server':<16} {'mode':<14} {'listening s':>12} {'ready s':>10}")
+    for script, env in RUNS:
+        listening, ready = measure(script, env)
+        mode = 'fast startup' if env.get('FAST_STARTUP') == '1' else 'default'
+        print(f"{script:<16} {mode:<14} {fmt(listening):>12} {fmt(ready):>10}")
+        # Let the port be released before the next run
+        time.sleep(1)
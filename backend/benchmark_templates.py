@@ -0,0 +1,85 @@
+"""
+Measure the template-only /api/analyze path of app_smart.py
+Run from the backend directory: python benchmark_templates.py
+
+Compares serializing the whole response with jsonify against splicing the
+pre-encoded caption/hashtag/schedule fragments, then reports end-to-end
+requests/sec through the Flask test client (text only, cache misses).
+"""
+import random
+import time
+
+from flask import jsonify
+
+import app_smart
+from json_encoding import spliced_response
+
+REPEATS = 5000
+REQUESTS = 2000
+PLATFORMS = ['instagram', 'facebook', 'linkedin', 'twitter']
+
+def dynamic_fields(theme):
+    """Per-request part of the response"""
+    return {
+        'decision': 'approved',
+        'confidence': round(random.uniform(0.85, 0.95), 2),
+        'insights': {'sentiment': 'POSITIVE'},
+        'text_analysis': {'label': 'POSITIVE', 'score': 0.92},
+        'image_analysis': app_smart.build_image_analysis(theme)
+    }
+
+def encode_full(theme, platform):
+    """Serialize every field of the response on each call"""
+    captions, hashtags = app_smart.get_platform_content(theme, platform)
+    response = dynamic_fields(theme)
+    response.update({
+        'captions': captions,
+        'hashtags': hashtags,
+        'best_time_schedule': app_smart.get_best_time_schedule(platform)
+    })
+    return jsonify(response).get_data()
+
+def encode_spliced(theme, platform):
+    """Serialize only the per-request fields"""
+    fragments = app_smart.get_content_fragments(theme, platform)
+    return spliced_response(dynamic_fields(theme), fragments).get_data()
+
+def time_encoder(encode):
+    """Mean microseconds per encoded response"""
+    themes = list(app_smart.THEMED_CAPTIONS)
+    with app_smart.app.app_context():
+        started = time.perf_counter()
+        for i in range(REPEATS):
+            encode(themes[i % len(themes)], PLATFORMS[i % len(PLATFORMS)])
+        return (time.perf_counter() - started) / REPEATS * 1e6
+
+def requests_per_second():
+    """Text-only analyze requests through the test client"""
+    client = app_smart.app.test_client()
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        client.post('/api/analyze', json={
+            'text': f"Sunset walk on the beach #{i}",
+            'platform': PLATFORMS[i % len(PLATFORMS)]
+        })
+    return REQUESTS / (time.perf_counter() - started)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TEMPLATE RESPONSE BENCHMARK")
+    print("=" * 60)
+
+    with app_smart.app.app_context():
+        full = app_smart.app.json.loads(encode_full('sunset', 'instagram'))
+        spliced = app_smart.app.json.loads(encode_spliced('sunset', 'instagram'))
+    for key in ('captions', 'hashtags', 'best_time_schedule'):
+        assert full[key] == spliced[key]
+
+    full_us = time_encoder(encode_full)
+    spliced_us = time_encoder(encode_spliced)
+    print(f"jsonify full response:  {full_us:8.1f} us")
+    print(f"spliced fragments:      {spliced_us:8.1f} us ({full_us / spliced_us:.1f}x)")
+
+    # Request logging would dominate the measurement
+    app_smart.print = lambda *args, **kwargs: None
+    print(f"end-to-end:             {requests_per_second():8.0f} req/s")
@@ -0,0 +1,64 @@
+"""
+Compare the compiled theme matcher with per-keyword substring scans
+Run from the backend directory: python benchmark_themes.py
+
+The baseline is the old detection style: one ``keyword in text`` scan per
+keyword, theme by theme. Both are checked to find the same themes first.
+"""
+import random
+import time
+
+from themes import THEME_KEYWORDS, theme_matcher
+
+CAPTION_LENGTHS = [200, 2000, 10000]
+REPEATS = 200
+
+FILLER = (
+    "just another lovely afternoon with everyone hanging out and sharing stories "
+    "about what happened this week while the music played softly in the background "
+).split()
+
+def substring_hits(text):
+    """Themes found by scanning for every keyword separately"""
+    text_lower = text.lower()
+    return {
+        theme for theme, keywords in THEME_KEYWORDS
+        if any(keyword in text_lower for keyword in keywords)
+    }
+
+def make_caption(length, keyword=None):
+    """Filler text of roughly ``length`` characters, keyword at the very end"""
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(random.choice(FILLER))
+    if keyword:
+        words.append(keyword)
+    return ' '.join(words)
+
+def time_per_call(func, text):
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        func(text)
+    return (time.perf_counter() - started) / REPEATS * 1e6
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("THEME DETECTION BENCHMARK")
+    print("=" * 60)
+
+    random.seed(0)
+    for length in CAPTION_LENGTHS:
+        for keyword in (None, 'crowd', 'golden hour'):
+            text = make_caption(length, keyword)
+            assert theme_matcher.hits(text) == substring_hits(text)
+    print("✅ Matcher agrees with substring scans")
+
+    print(f"{'chars':>7} {'last keyword':>13} {'scans us':>10} {'matcher us':>11} {'speedup':>8}")
+    for length in CAPTION_LENGTHS:
+        for keyword in (None, 'travel'):
+            text = make_caption(length, keyword)
+            baseline = time_per_call(substring_hits, text)
+            compiled = time_per_call(theme_matcher.hits, text)
+            label = keyword or '-'
+            print(f"{len(text):>7} {label:>13} {baseline:>10.1f} {compiled:>11.1f} {baseline / compiled:>7.1f}x")
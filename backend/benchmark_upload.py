@@ -0,0 +1,93 @@
+"""
+Compare request parsing cost of base64 JSON, multipart and raw binary uploads
+Run from the backend directory: python benchmark_upload.py
+
+For each body format this measures wire size, parse + decode time and the
+peak Python heap allocated while handling one request (tracemalloc).
+"""
+import base64
+import io
+import json
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+from flask import Flask
+from PIL import Image
+
+from image_io import open_image
+from uploads import read_analyze_request
+
+IMAGE_SIZES = [(1280, 960), (4032, 3024)]
+REPEATS = 5
+
+app = Flask(__name__)
+
+def make_jpeg(size):
+    """Noisy JPEG so the encoded size resembles a real photo"""
+    pixels = np.random.randint(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+def build_bodies(jpeg):
+    """Request kwargs for each supported upload format"""
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode('ascii')
+    return {
+        'base64 JSON': {
+            'data': json.dumps({'text': 'Sunset at the beach', 'image': data_url}),
+            'content_type': 'application/json'
+        },
+        'multipart': {
+            'data': {'text': 'Sunset at the beach', 'image': (io.BytesIO(jpeg), 'photo.jpg')},
+            'content_type': 'multipart/form-data'
+        },
+        'octet-stream': {
+            'data': jpeg,
+            'content_type': 'application/octet-stream',
+            'query_string': {'text': 'Sunset at the beach'}
+        }
+    }
+
+def wire_size(kwargs):
+    """Body size as it would be sent over the network"""
+    with app.test_request_context('/api/analyze', method='POST', **kwargs) as ctx:
+        return len(ctx.request.get_data(cache=True))
+
+def measure(kwargs):
+    """Median parse+decode time and peak traced memory for one request"""
+    timings = []
+    peaks = []
+    for _ in range(REPEATS):
+        if 'multipart' in kwargs['content_type']:
+            kwargs['data']['image'][0].seek(0)
+        with app.test_request_context('/api/analyze', method='POST', **kwargs):
+            tracemalloc.start()
+            started = time.perf_counter()
+
+            _, image_bytes = read_analyze_request()
+            open_image(image_bytes)
+
+            timings.append((time.perf_counter() - started) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+            tracemalloc.stop()
+    return statistics.median(timings), max(peaks)
+
+if __name__ == "__main__":
+    print("=" * 72)
+    print("UPLOAD FORMAT BENCHMARK")
+    print("=" * 72)
+    print(f"{'image':>11} {'format':>13} {'wire MB':>8} {'parse ms':>9} {'peak heap MB':>13}")
+
+    for size in IMAGE_SIZES:
+        jpeg = make_jpeg(size)
+        for name, kwargs in build_bodies(jpeg).items():
+            if 'multipart' in kwargs['content_type']:
+                # Multipart framing adds only a few hundred bytes to the raw file
+                wire = len(jpeg)
+            else:
+                wire = wire_size(kwargs)
+            elapsed, peak = measure(kwargs)
+            label = f"{size[0]}x{size[1]}"
+            print(f"{label:>11} {name:>13} {wire / 1024 / 1024:>8.2f} {elapsed:>9.1f} {peak:>13.2f}")
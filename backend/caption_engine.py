@@ -0,0 +1,249 @@
+"""
+Batched GPT-2 caption generation for every social platform
+
+All platform prompts are tokenized into one left-padded batch and sampled in
+a single ``generate`` call. Each row keeps its platform's temperature through
+a per-row logits processor, and its platform's ``max_length`` by trimming the
+row after generation (sampling is causal, so trimming is equivalent to
+stopping early).
+
+With ``reuse_prefix_cache`` the token prefix shared by every row (the
+request context) is run through the model once and its attention key/value
+states are expanded across all platform rows and return sequences, so only
+the short platform suffixes are prefilled per row.
+"""
+import os
+
+import torch
+from transformers import LogitsProcessor, LogitsProcessorList
+
+# (platform, prompt suffix, max_length in tokens, temperature, max characters)
+CAPTION_PLATFORMS = (
+    ('instagram', 'Instagram style with emojis:', 60, 0.8, 200),
+    ('facebook', 'Facebook post:', 80, 0.7, 250),
+    ('linkedin', 'Professional LinkedIn post:', 70, 0.6, 220),
+)
+CAPTIONS_PER_PLATFORM = 3
+
+# Contexts whose rows share one ``generate`` call in ``generate_many``
+CAPTION_BATCH_CONTEXTS = int(os.environ.get('CAPTION_BATCH_CONTEXTS', '4'))
+
+
+class PerRowTemperature(LogitsProcessor):
+    """Divide each row's logits by that row's own sampling temperature"""
+
+    def __init__(self, temperatures):
+        self.temperatures = temperatures
+
+    def __call__(self, input_ids, scores):
+        return scores / self.temperatures
+
+
+class CaptionEngine:
+    """Generate captions for all platforms from one shared context"""
+
+    def __init__(self, model, tokenizer, platforms=CAPTION_PLATFORMS,
+                 num_captions=CAPTIONS_PER_PLATFORM, reuse_prefix_cache=False):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.platforms = platforms
+        self.num_captions = num_captions
+        self.reuse_prefix_cache = reuse_prefix_cache
+
+        # GPT-2 has no pad token; left padding keeps every prompt's last token aligned
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = 'left'
+
+    def empty_captions(self):
+        """``{platform: []}`` for posts whose captions are not generated"""
+        return {platform: [] for platform, *_ in self.platforms}
+
+    def build_rows(self, context):
+        """Expand a context into one generation row per platform caption"""
+        rows = []
+        for platform, suffix, max_length, temperature, max_chars in self.platforms:
+            prompt = f"{context} {suffix}"
+            for _ in range(self.num_captions):
+                rows.append({
+                    'platform': platform,
+                    'prompt': prompt,
+                    'max_length': max_length,
+                    'temperature': temperature,
+                    'max_chars': max_chars
+                })
+        return rows
+
+    def generate(self, context):
+        """Return ``{platform: [caption, ...]}`` from a single batched pass"""
+        rows = self.build_rows(context)
+        texts = self.generate_rows(rows)
+
+        captions = {platform: [] for platform, *_ in self.platforms}
+        for row, text in zip(rows, texts):
+            captions[row['platform']].append(text)
+        return captions
+
+    def generate_many(self, contexts, contexts_per_batch=None):
+        """``generate`` for a list of contexts, several contexts per ``generate`` call"""
+        per_batch = max(1, contexts_per_batch or CAPTION_BATCH_CONTEXTS)
+        results = []
+        for start in range(0, len(contexts), per_batch):
+            group = contexts[start:start + per_batch]
+            rows = []
+            owners = []
+            for index, context in enumerate(group):
+                context_rows = self.build_rows(context)
+                rows.extend(context_rows)
+                owners.extend([index] * len(context_rows))
+
+            texts = self.generate_rows(rows)
+
+            group_captions = [{platform: [] for platform, *_ in self.platforms} for _ in group]
+            for owner, row, text in zip(owners, rows, texts):
+                group_captions[owner][row['platform']].append(text)
+            results.extend(group_captions)
+        return results
+
+    def iter_platforms(self, context):
+        """Yield ``(platform, captions)`` one platform at a time for streaming
+
+        The shared prefix is still prefilled only once and reused by every
+        platform's generate call.
+        """
+        rows = self.build_rows(context)
+        prefix = None
+        if self.reuse_prefix_cache:
+            prefix = self.prefill_prefix(self.tokenize_rows(rows))
+
+        for platform, *_ in self.platforms:
+            platform_rows = [row for row in rows if row['platform'] == platform]
+            yield platform, self.generate_rows(platform_rows, prefix=prefix)
+
+    def generate_rows(self, rows, max_new_tokens=None, prefix=None):
+        """Sample one caption per row in a single ``generate`` call"""
+        inputs = None
+        if self.reuse_prefix_cache:
+            inputs, prompt_lengths = self.prefix_cached_inputs(rows, prefix)
+        if inputs is None:
+            inputs, prompt_lengths = self.padded_inputs(rows)
+
+        budgets = [
+            max(0, row['max_length'] - length)
+            for row, length in zip(rows, prompt_lengths)
+        ]
+        longest = max(budgets)
+        if max_new_tokens is not None:
+            longest = min(longest, max_new_tokens)
+        if longest == 0:
+            return ['' for _ in rows]
+
+        temperatures = torch.tensor(
+            [[row['temperature']] for row in rows],
+            dtype=torch.float,
+            device=self.model.device
+        )
+
+        with torch.no_grad():
+            output = self.model.generate(
+                **inputs,
+                do_sample=True,
+                max_new_tokens=longest,
+                logits_processor=LogitsProcessorList([PerRowTemperature(temperatures)]),
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+
+        return self.decode_rows(output, inputs['input_ids'].shape[1], rows, budgets)
+
+    def padded_inputs(self, rows):
+        """Tokenize every full prompt into one left-padded batch"""
+        encoded = self.tokenizer(
+            [row['prompt'] for row in rows],
+            return_tensors='pt',
+            padding=True
+        ).to(self.model.device)
+
+        prompt_lengths = encoded['attention_mask'].sum(dim=1).tolist()
+        return dict(encoded), prompt_lengths
+
+    def tokenize_rows(self, rows):
+        """Token ids of every row's full prompt, without padding"""
+        return [self.tokenizer(row['prompt'])['input_ids'] for row in rows]
+
+    def prefill_prefix(self, token_rows):
+        """Run the token prefix shared by all rows through the model once
+
+        Returns ``(shared_length, past_key_values)`` or ``None`` when the
+        rows share no usable prefix. Comparing ids of the full prompts keeps
+        BPE merges across the prefix/suffix boundary identical to the padded
+        path, and at least one token per row is left for the suffix.
+        """
+        shared = min(len(ids) for ids in token_rows) - 1
+        for i in range(shared):
+            token = token_rows[0][i]
+            if any(ids[i] != token for ids in token_rows):
+                shared = i
+                break
+        if shared <= 0:
+            return None
+
+        prefix = torch.tensor([token_rows[0][:shared]], device=self.model.device)
+        with torch.no_grad():
+            past = self.model(prefix, use_cache=True).past_key_values
+        return shared, past
+
+    def prefix_cached_inputs(self, rows, prefix=None):
+        """Lay rows out behind a prefilled shared prefix
+
+        Rows are laid out as ``prefix | padding | suffix`` with the padding
+        masked out; GPT-2 derives position ids from the attention mask, so
+        every suffix continues at the position right after the prefix.
+        Returns ``(None, None)`` when the rows share no usable prefix.
+        """
+        token_rows = self.tokenize_rows(rows)
+        if prefix is None:
+            prefix = self.prefill_prefix(token_rows)
+        if prefix is None:
+            return None, None
+        shared, past = prefix
+
+        device = self.model.device
+        suffixes = [ids[shared:] for ids in token_rows]
+        width = max(len(suffix) for suffix in suffixes)
+        pad_id = self.tokenizer.pad_token_id
+
+        input_ids = []
+        attention_mask = []
+        for suffix in suffixes:
+            padding = width - len(suffix)
+            input_ids.append(token_rows[0][:shared] + [pad_id] * padding + suffix)
+            attention_mask.append([1] * shared + [0] * padding + [1] * len(suffix))
+
+        inputs = {
+            'input_ids': torch.tensor(input_ids, device=device),
+            'attention_mask': torch.tensor(attention_mask, device=device),
+            'past_key_values': expand_past(past, len(rows))
+        }
+        prompt_lengths = [shared + len(suffix) for suffix in suffixes]
+        return inputs, prompt_lengths
+
+    def decode_rows(self, output, prompt_width, rows, budgets):
+        """Decode each row's new tokens, trimmed to its platform limits"""
+        texts = []
+        for i, row in enumerate(rows):
+            tokens = output[i, prompt_width:prompt_width + budgets[i]]
+            text = self.tokenizer.decode(tokens, skip_special_tokens=True)
+            texts.append(text.strip()[:row['max_chars']])
+        return texts
+
+
+def expand_past(past, batch_size):
+    """Broadcast a batch-of-one key/value cache to ``batch_size`` rows"""
+    if hasattr(past, 'to_legacy_cache'):
+        past = past.to_legacy_cache()
+
+    # expand() is a view; the first decoding step's torch.cat makes real copies
+    return tuple(
+        tuple(state.expand(batch_size, -1, -1, -1) for state in layer)
+        for layer in past
+    )
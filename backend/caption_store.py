@@ -0,0 +1,171 @@
+"""
+Persistent vision-caption store shared by every worker process
+
+Captions are keyed by the SHA-256 of the uploaded image bytes and the model
+that produced them, in a SQLite table (WAL mode, so concurrent readers in
+other processes never block on a writer). Recently used rows are kept in
+an in-process LRU in front of the table and can be warm-loaded at startup.
+The table is bounded by row count, evicting the least recently used.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from result_cache import ResultCache
+
+CAPTION_STORE_PATH = os.environ.get('CAPTION_STORE_PATH', '')
+CAPTION_STORE_MAX_ENTRIES = int(os.environ.get('CAPTION_STORE_MAX_ENTRIES', '100000'))
+CAPTION_STORE_WARM_ENTRIES = int(os.environ.get('CAPTION_STORE_WARM_ENTRIES', '1024'))
+
+# Evict in batches rather than on every insert
+EVICTION_INTERVAL = 100
+
+
+def image_digest(image_bytes):
+    """Content hash used as the store key"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def open_caption_store(app):
+    """Caption store next to the app's users.db unless CAPTION_STORE_PATH is set"""
+    return CaptionStore(CAPTION_STORE_PATH or os.path.join(app.instance_path, 'captions.db'))
+
+
+class CaptionStore:
+    """SQLite-backed ``(image_hash, model_id) -> caption`` map with LRU eviction
+
+    ``last_used`` is refreshed whenever a row is read from disk; hits served
+    from the in-process LRU do not write.
+    """
+
+    def __init__(self, path, max_entries=CAPTION_STORE_MAX_ENTRIES,
+                 memory_entries=CAPTION_STORE_WARM_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._memory = ResultCache('caption_store', max_entries=memory_entries, ttl_seconds=0)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS captions (
+                image_hash TEXT NOT NULL,
+                model_id TEXT NOT NULL,
+                caption TEXT NOT NULL,
+                phash TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (image_hash, model_id)
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS captions_last_used ON captions (last_used)')
+
+        # SQLite connections must not be used across fork, so pre-forked
+        # workers (serve.py) each open their own
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reopen)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reopen(self):
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def get(self, image_hash, model_id):
+        """Stored caption or None"""
+        key = (image_hash, model_id)
+        caption = self._memory.get(key)
+        if caption is None:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT caption FROM captions WHERE image_hash = ? AND model_id = ?', key
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        'UPDATE captions SET last_used = ? WHERE image_hash = ? AND model_id = ?',
+                        (time.time(), image_hash, model_id)
+                    )
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            caption = row[0]
+            self._memory.put(key, caption)
+
+        with self._lock:
+            self.hits += 1
+        return caption
+
+    def put(self, image_hash, model_id, caption, phash=None):
+        """Store a caption (and optionally the image's perceptual hash)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO captions (image_hash, model_id, caption, phash, created_at, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (image_hash, model_id)
+                   DO UPDATE SET caption = excluded.caption, phash = excluded.phash,
+                                 last_used = excluded.last_used""",
+                (image_hash, model_id, caption, None if phash is None else f"{phash:016x}", now, now)
+            )
+            self._puts += 1
+            if self._puts % EVICTION_INTERVAL == 0:
+                self._evict()
+        self._memory.put((image_hash, model_id), caption)
+
+    def _evict(self):
+        """Drop least recently used rows beyond ``max_entries`` (lock held)"""
+        excess = self._conn.execute('SELECT COUNT(*) FROM captions').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                """DELETE FROM captions WHERE rowid IN (
+                       SELECT rowid FROM captions ORDER BY last_used LIMIT ?
+                   )""",
+                (excess,)
+            )
+            self.evictions += excess
+
+    def warm(self, model_id, limit=CAPTION_STORE_WARM_ENTRIES):
+        """Load the most recently used captions of ``model_id`` into memory
+
+        Returns ``(phash, caption)`` pairs for rows that have a perceptual
+        hash, so the caller can also warm its near-duplicate index.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT image_hash, caption, phash FROM captions
+                   WHERE model_id = ? ORDER BY last_used DESC LIMIT ?""",
+                (model_id, limit)
+            ).fetchall()
+
+        # Oldest first so the most recent end up most recently used
+        for image_hash, caption, _ in reversed(rows):
+            self._memory.put((image_hash, model_id), caption)
+        return [(int(phash, 16), caption) for _, caption, phash in reversed(rows) if phash]
+
+    def stats(self):
+        """Row count, hit counts and evictions for monitoring"""
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM captions').fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'size': size,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'memory': self._memory.stats()
+            }
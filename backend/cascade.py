@@ -0,0 +1,63 @@
+"""
+Cheap-first analysis cascade: run expensive stages only when they matter
+
+Each server scores a post with its cheap checks first (sentiment, keyword
+themes, color statistics) and only escalates to the expensive stages (face
+detection, ResNet-50, GPT-2, Gemini) when their output can still change the
+result or is actually returned. A ``StageCounter`` records how often each
+expensive stage ran or was skipped, and how long its runs took, so
+/api/stats shows how much compute the cascade saves.
+
+``CASCADE_ENABLED=0`` runs every stage for every post, as before.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+CASCADE_ENABLED = os.environ.get('CASCADE_ENABLED', '1') == '1'
+
+
+class StageCounter:
+    """Thread-safe ran/skipped counts and run time per pipeline stage"""
+
+    def __init__(self, stages):
+        self._counts = {stage: {'ran': 0, 'skipped': 0, 'seconds': 0.0} for stage in stages}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def run(self, stage, count=1):
+        """Time ``stage`` running for ``count`` posts at once"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                counts = self._counts[stage]
+                counts['ran'] += count
+                counts['seconds'] += elapsed
+
+    def skip(self, stage, count=1):
+        """Record that the cascade skipped ``stage`` for ``count`` posts"""
+        with self._lock:
+            self._counts[stage]['skipped'] += count
+
+    def stats(self):
+        """Per stage: runs, skips, skip rate, mean run time and the time skips saved"""
+        with self._lock:
+            counts = {stage: dict(values) for stage, values in self._counts.items()}
+
+        stats = {}
+        for stage, values in counts.items():
+            total = values['ran'] + values['skipped']
+            mean_ms = values['seconds'] * 1000 / values['ran'] if values['ran'] else 0.0
+            stats[stage] = {
+                'ran': values['ran'],
+                'skipped': values['skipped'],
+                'skip_rate': round(values['skipped'] / total, 4) if total else 0.0,
+                'mean_ms': round(mean_ms, 1),
+                # Skipped posts priced at the mean cost of the posts that ran
+                'estimated_saved_ms': round(values['skipped'] * mean_ms, 1)
+            }
+        return {'enabled': CASCADE_ENABLED, 'stages': stats}
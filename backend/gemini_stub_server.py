@@ -0,0 +1,134 @@
+"""
+Local stand-in for the Gemini captioning API with injectable latency
+Run from the backend directory: python gemini_stub_server.py [--port 8765]
+
+Point app_smart.py at it with GEMINI_STUB_URL=http://127.0.0.1:8765 to test
+deadlines, hedging and the circuit breaker offline. Each request sleeps for
+``--latency-ms`` (with ``--jitter-ms`` of uniform noise); a ``--tail-fraction``
+of requests instead take ``--tail-ms``, and ``--error-rate`` of them fail.
+``--uplink-mbps`` adds the time the request body would take to upload.
+"""
+import argparse
+import io
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_CAPTIONS = [
+    "A vibrant orange sunset over a calm ocean with silhouetted palm trees.",
+    "A group of friends laughing together at an outdoor cafe table.",
+    "A golden retriever running across a green park lawn.",
+    "A plate of fresh pasta with basil on a rustic wooden table.",
+    "A city skyline at dusk with lights reflecting on the river."
+]
+
+
+class LatencyProfile:
+    """Per-request delay and failure injection"""
+
+    def __init__(self, latency_ms=300, jitter_ms=100, tail_ms=5000, tail_fraction=0.0,
+                 error_rate=0.0, uplink_mbps=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_ms = tail_ms
+        self.tail_fraction = tail_fraction
+        self.error_rate = error_rate
+        self.uplink_mbps = uplink_mbps
+
+    def delay_seconds(self, body_bytes=0):
+        upload = body_bytes * 8 / (self.uplink_mbps * 1e6) if self.uplink_mbps > 0 else 0
+        if random.random() < self.tail_fraction:
+            return upload + self.tail_ms / 1000
+        return upload + max(0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+
+def make_handler(profile):
+    """Request handler class bound to a latency profile"""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(profile.delay_seconds(len(body)))
+
+            if random.random() < profile.error_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            payload = json.dumps({
+                'text': random.choice(STUB_CAPTIONS),
+                'bytes_received': len(body)
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(profile, port=0):
+    """Serve the stub on a background thread; returns ``(server, url)``"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(profile))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class StubResponse:
+    """Mimics the ``.text`` attribute of a Gemini response"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Drop-in for ``genai.GenerativeModel`` that posts images to the stub server"""
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/') + '/generate'
+        self.timeout = timeout
+
+    @staticmethod
+    def _image_bytes(parts):
+        for part in parts:
+            if isinstance(part, dict) and 'data' in part:
+                return part['data']
+            if hasattr(part, 'save'):
+                buffer = io.BytesIO()
+                part.save(buffer, format='JPEG', quality=95)
+                return buffer.getvalue()
+        return b''
+
+    def generate_content(self, parts):
+        request = urllib.request.Request(
+            self.url, data=self._image_bytes(parts),
+            headers={'Content-Type': 'application/octet-stream'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return StubResponse(json.loads(response.read())['text'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--jitter-ms', type=float, default=100)
+    parser.add_argument('--tail-ms', type=float, default=5000)
+    parser.add_argument('--tail-fraction', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--uplink-mbps', type=float, default=0.0)
+    args = parser.parse_args()
+
+    profile = LatencyProfile(args.latency_ms, args.jitter_ms, args.tail_ms, args.tail_fraction,
+                             args.error_rate, args.uplink_mbps)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(profile))
+    print(f"🧪 Gemini stub listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,173 @@
+"""
+Shared image decoding helpers for the backend servers
+
+Callers name the analysis stages that will consume the image, and the
+decoder only produces as many pixels as the most demanding stage needs:
+JPEGs are decoded at a reduced DCT scale (``Image.draft``), or replaced by
+the embedded EXIF thumbnail when that is already large enough.
+"""
+import base64
+import binascii
+import io
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from PIL import ExifTags, Image
+
+from metrics import Histogram
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Shorter-side pixels each analysis stage needs; 0 means full resolution.
+# Haar face detection and Canny edge density depend on the pixel scale, so
+# they keep the full image unless a smaller side is opted into
+STAGE_MIN_SIDE = {
+    'phash': 32,
+    'colors': 64,
+    'resnet': 256,
+    'blip': 384,
+    'faces': int(os.environ.get('FACE_DETECT_MIN_SIDE', '0')),
+    'edges': int(os.environ.get('EDGE_DETECT_MIN_SIDE', '0')),
+    'gemini': int(os.environ.get('GEMINI_MIN_SIDE', '768')),
+}
+REDUCED_DECODE = os.environ.get('REDUCED_DECODE', '1') == '1'
+
+# Print every decode; /api/stats reports the same data in aggregate
+DECODE_LOG = os.environ.get('DECODE_LOG', '0') == '1'
+
+EXIF_THUMBNAIL_OFFSET = 0x0201
+EXIF_THUMBNAIL_LENGTH = 0x0202
+
+decode_time = Histogram('image_decode', unit='ms')
+_decode_sources = Counter()
+_decode_lock = threading.Lock()
+
+
+def decode_base64_bytes(image_data):
+    """Decode a base64 string or data URL to raw image bytes (None if invalid)"""
+    try:
+        # Remove data URL prefix if present
+        if ',' in image_data:
+            image_data = image_data.split(',', 1)[1]
+        return base64.b64decode(image_data)
+    except (binascii.Error, ValueError) as e:
+        print(f"Error decoding base64 image: {str(e)}")
+        return None
+
+
+def peak_rss_mb():
+    """Process peak resident set size in MB, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux but bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def exif_thumbnail(image, min_side):
+    """The embedded EXIF JPEG thumbnail if it is big enough to stand in for the image"""
+    if 'exif' not in image.info:
+        return None
+
+    try:
+        thumbnail_ifd = image.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset = thumbnail_ifd.get(EXIF_THUMBNAIL_OFFSET)
+        length = thumbnail_ifd.get(EXIF_THUMBNAIL_LENGTH)
+        if not offset or not length:
+            return None
+
+        # Offsets are relative to the TIFF header that follows b"Exif\0\0"
+        raw = image.info['exif'][6 + offset:6 + offset + length]
+        thumbnail = Image.open(io.BytesIO(raw))
+        if min(thumbnail.size) < min_side:
+            return None
+
+        # Editors often leave a stale thumbnail behind after cropping
+        width, height = image.size
+        thumb_width, thumb_height = thumbnail.size
+        if abs(width / height - thumb_width / thumb_height) > 0.01:
+            return None
+
+        thumbnail.load()
+        return thumbnail
+    except Exception:
+        return None
+
+
+def open_image(image_bytes, stages=None):
+    """Decode raw image bytes to an RGB PIL Image
+
+    ``stages`` names the consumers (keys of ``STAGE_MIN_SIDE``); the image is
+    decoded at the smallest resolution that still satisfies all of them.
+    """
+    started = time.perf_counter()
+    image = Image.open(io.BytesIO(image_bytes))
+    original_size = image.size
+    source = 'full'
+
+    min_sides = [STAGE_MIN_SIDE[stage] for stage in stages or ()]
+    if min_sides and 0 not in min_sides and REDUCED_DECODE and image.format == 'JPEG':
+        min_side = max(min_sides)
+        scale = min_side / min(original_size)
+
+        if scale < 1:
+            thumbnail = exif_thumbnail(image, min_side)
+            if thumbnail is not None:
+                image = thumbnail
+                source = 'exif_thumbnail'
+            else:
+                # The decoder picks the smallest DCT scale at or above this size
+                image.draft('RGB', (
+                    math.ceil(original_size[0] * scale),
+                    math.ceil(original_size[1] * scale)
+                ))
+                if image.size != original_size:
+                    source = 'draft'
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    else:
+        image.load()
+
+    elapsed = (time.perf_counter() - started) * 1000
+    decode_time.observe(elapsed)
+    with _decode_lock:
+        _decode_sources[source] += 1
+
+    if DECODE_LOG:
+        rss = peak_rss_mb()
+        print(
+            f"🖼️ Decoded {image.size[0]}x{image.size[1]} of {original_size[0]}x{original_size[1]} "
+            f"({source}) in {elapsed:.1f} ms"
+            + (f", peak RSS {rss:.0f} MB" if rss is not None else "")
+        )
+    return image
+
+
+def encode_jpeg_blob(image, max_side=None, quality=85):
+    """Downscale so the longer side is at most ``max_side`` and re-encode as a JPEG blob"""
+    if max_side and max(image.size) > max_side:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=2.0)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality)
+    return {'mime_type': 'image/jpeg', 'data': buffer.getvalue()}
+
+
+def decode_stats():
+    """Decode timings, sources and process peak RSS for monitoring"""
+    with _decode_lock:
+        sources = dict(_decode_sources)
+    return {
+        'decode_ms': decode_time.snapshot(),
+        'sources': sources,
+        'peak_rss_mb': peak_rss_mb()
+    }
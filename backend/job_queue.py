@@ -0,0 +1,422 @@
+"""
+SQLite-backed job queue for analyses that outlive an HTTP request
+
+Jobs are rows in a local SQLite table (WAL mode), so queued and running
+work survives restarts and can be shared by several server processes. A
+bounded pool of worker threads claims the oldest queued job inside an
+``IMMEDIATE`` transaction and holds a lease on it that a heartbeat thread
+keeps renewing; if the process dies, the lease lapses and another worker
+(or the restarted server) picks the job up again. When a job finishes, its
+result is stored and, if the submitter gave a callback URL, POSTed there.
+"""
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from urllib.parse import urlparse
+
+from flask import jsonify, url_for
+
+from json_encoding import json_default
+from metrics import Histogram
+from uploads import read_analyze_request
+
+JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH', '')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_QUEUE_MAX_PENDING = int(os.environ.get('JOB_QUEUE_MAX_PENDING', '1000'))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '30'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETENTION_SECONDS = float(os.environ.get('JOB_RETENTION_SECONDS', '86400'))
+JOB_CALLBACK_TIMEOUT_SECONDS = float(os.environ.get('JOB_CALLBACK_TIMEOUT_SECONDS', '10'))
+# Comma-separated hosts callbacks may be sent to ('*' for any public host); empty disables callbacks
+JOB_CALLBACK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.environ.get('JOB_CALLBACK_ALLOWED_HOSTS', '').split(',') if host.strip()
+}
+
+# How often idle workers look for jobs submitted by other processes
+POLL_SECONDS = 1.0
+
+JOB_TIME_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+
+
+class QueueFullError(RuntimeError):
+    """Too many jobs are already waiting"""
+
+
+def validate_callback_url(url):
+    """Return ``url`` if it may receive job callbacks, else raise ValueError
+
+    The URL must be absolute http(s), its host must be in
+    JOB_CALLBACK_ALLOWED_HOSTS, and every address the host resolves to must
+    be public, so a client cannot make the server POST to loopback, private,
+    link-local (cloud metadata) or reserved addresses.
+    """
+    if not JOB_CALLBACK_ALLOWED_HOSTS:
+        raise ValueError('callback_url is not accepted: JOB_CALLBACK_ALLOWED_HOSTS is not set')
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError('callback_url must be an absolute http or https URL')
+    host = parsed.hostname.lower()
+    if '*' not in JOB_CALLBACK_ALLOWED_HOSTS and host not in JOB_CALLBACK_ALLOWED_HOSTS:
+        raise ValueError(f'callback_url host {host} is not allowed')
+
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError):
+        raise ValueError(f'callback_url host {host} does not resolve')
+    for address in addresses:
+        if not ipaddress.ip_address(address.split('%', 1)[0]).is_global:
+            raise ValueError(f'callback_url host {host} resolves to a non-public address')
+    return url
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Refuse redirects, which would bypass the callback host checks"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise urllib.error.HTTPError(req.full_url, code, f'callback redirected to {newurl}', headers, fp)
+
+
+callback_opener = urllib.request.build_opener(NoRedirectHandler)
+
+
+def submit_analysis_job(queue):
+    """Queue the current /api/jobs request; 202 with the job ID and status URL
+
+    The body is anything /api/analyze accepts, plus an optional
+    ``callback_url`` field (a query parameter for binary uploads).
+    """
+    try:
+        fields, image_bytes = read_analyze_request()
+        callback_url = fields.pop('callback_url', None)
+        job_id = queue.submit(fields, image_bytes, callback_url)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    status_url = url_for('get_job', job_id=job_id)
+    print(f"📋 Queued job {job_id}")
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': status_url}), 202, {
+        'Location': status_url
+    }
+
+
+def job_status_response(queue, job_id):
+    """JSON view of a job, or 404"""
+    job = queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+
+def open_job_queue(app, handler):
+    """Job queue next to the app's users.db unless JOB_QUEUE_PATH is set"""
+    return JobQueue(JOB_QUEUE_PATH or os.path.join(app.instance_path, 'jobs.db'), handler)
+
+
+class JobQueue:
+    """Persistent FIFO of ``handler(fields, image_bytes) -> result`` calls
+
+    Workers start on the first ``submit`` or an explicit ``start``. A
+    handler exception fails the job; a job whose worker died is run again
+    until it has been attempted ``max_attempts`` times.
+    """
+
+    def __init__(self, path, handler, workers=JOB_WORKERS, max_pending=JOB_QUEUE_MAX_PENDING,
+                 lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.owner = uuid.uuid4().hex
+        self.wait_time = Histogram('job_wait_time', buckets=JOB_TIME_BUCKETS, unit='ms')
+        self.run_time = Histogram('job_run_time', buckets=JOB_TIME_BUCKETS, unit='ms')
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._started = False
+        self._running = set()
+        self.completed = 0
+        self.failed = 0
+        self.lost_leases = 0
+        self.recovered = 0
+        self.callbacks_sent = 0
+        self.callbacks_failed = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                image BLOB,
+                callback_url TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                lease_until REAL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)')
+
+        # Each pre-forked worker (serve.py) gets its own connection, lease
+        # owner and worker threads
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._started = False
+        self._running = set()
+        self.owner = uuid.uuid4().hex
+        self._conn = self._connect()
+
+    def start(self):
+        """Start the worker and heartbeat threads (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        for index in range(self.workers):
+            threading.Thread(target=self._work, name=f'job_worker_{index}', daemon=True).start()
+        threading.Thread(target=self._heartbeat, name='job_heartbeat', daemon=True).start()
+
+        with self._lock:
+            queued = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+        print(f"📋 Job queue started with {self.workers} workers ({queued} jobs pending)")
+
+    def submit(self, fields, image_bytes=None, callback_url=None):
+        """Persist a job and return its ID
+
+        Raises ``QueueFullError`` when ``max_pending`` jobs are already queued.
+        """
+        if callback_url:
+            validate_callback_url(callback_url)
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            depth = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if depth >= self.max_pending:
+                raise QueueFullError(f'Job queue is full ({depth} jobs waiting)')
+            self._conn.execute(
+                """INSERT INTO jobs (id, status, fields, image, callback_url, created_at)
+                   VALUES (?, 'queued', ?, ?, ?, ?)""",
+                (job_id, json.dumps(fields, default=json_default), image_bytes,
+                 callback_url or None, time.time())
+            )
+
+        self.start()
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Public view of a job, or None if the ID is unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT id, status, result, error, attempts, created_at, started_at, finished_at
+                   FROM jobs WHERE id = ?""",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job_id, status, result, error, attempts, created_at, started_at, finished_at = row
+        return {
+            'job_id': job_id,
+            'status': status,
+            'attempts': attempts,
+            'created_at': created_at,
+            'started_at': started_at,
+            'finished_at': finished_at,
+            'result': json.loads(result) if result is not None else None,
+            'error': error
+        }
+
+    def _claim(self):
+        """Lease the oldest runnable job; returns ``(id, fields, image, created_at)`` or None"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Jobs whose lease lapsed were left behind by a dead worker
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'failed', error = 'Too many attempts', finished_at = ?,
+                                      image = NULL, owner = NULL, lease_until = NULL
+                       WHERE status = 'running' AND lease_until < ? AND attempts >= ?""",
+                    (now, now, self.max_attempts)
+                )
+                row = self._conn.execute(
+                    """SELECT id, fields, image, created_at, status FROM jobs
+                       WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)
+                       ORDER BY created_at LIMIT 1""",
+                    (now,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        """UPDATE jobs SET status = 'running', owner = ?, lease_until = ?,
+                                          attempts = attempts + 1, started_at = ?
+                           WHERE id = ?""",
+                        (self.owner, now + self.lease_seconds, now, row[0])
+                    )
+                    self._running.add(row[0])
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        if row is None:
+            return None
+        job_id, fields, image_bytes, created_at, previous_status = row
+        if previous_status == 'running':
+            with self._lock:
+                self.recovered += 1
+            print(f"♻️ Recovered job {job_id} after its lease expired")
+        return job_id, json.loads(fields), image_bytes, created_at
+
+    def _finish(self, job_id, result=None, error=None):
+        """Store the outcome of a job this process holds; returns its callback URL
+
+        Returns None without counting the job when the lease was lost and
+        another worker has taken it over, since that run reports it.
+        """
+        with self._lock:
+            self._running.discard(job_id)
+            cursor = self._conn.execute(
+                """UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,
+                                  image = NULL, owner = NULL, lease_until = NULL
+                   WHERE id = ? AND owner = ?""",
+                ('failed' if error is not None else 'done',
+                 json.dumps(result, default=json_default) if error is None else None,
+                 error, time.time(), job_id, self.owner)
+            )
+            if cursor.rowcount == 0:
+                self.lost_leases += 1
+                print(f"⚠️ Lost the lease on job {job_id}; discarding this run's outcome")
+                return None
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            row = self._conn.execute('SELECT callback_url FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def _work(self):
+        while True:
+            try:
+                claimed = self._claim()
+            except sqlite3.Error as e:
+                print(f"❌ Job queue error: {str(e)}")
+                claimed = None
+            if claimed is None:
+                with self._wake:
+                    self._wake.wait(POLL_SECONDS)
+                continue
+
+            job_id, fields, image_bytes, created_at = claimed
+            started = time.time()
+            self.wait_time.observe((started - created_at) * 1000)
+            try:
+                result = self.handler(fields, image_bytes)
+                error = None
+            except Exception as e:
+                print(f"❌ Job {job_id} failed: {str(e)}")
+                result, error = None, str(e)
+            self.run_time.observe((time.time() - started) * 1000)
+
+            callback_url = self._finish(job_id, result, error)
+            if callback_url:
+                self._send_callback(callback_url, self.get(job_id))
+
+    def _send_callback(self, url, job):
+        """POST the finished job to its callback URL (one attempt)
+
+        The URL is checked again here, since the host may resolve to a
+        different address than it did at submission.
+        """
+        request = urllib.request.Request(
+            url, data=json.dumps(job, default=json_default).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            validate_callback_url(url)
+            with callback_opener.open(request, timeout=JOB_CALLBACK_TIMEOUT_SECONDS):
+                pass
+            with self._lock:
+                self.callbacks_sent += 1
+        except Exception as e:
+            print(f"⚠️ Callback for job {job['job_id']} failed: {str(e)}")
+            with self._lock:
+                self.callbacks_failed += 1
+
+    def _heartbeat(self):
+        """Renew leases on jobs this process is running and prune old results"""
+        while True:
+            time.sleep(max(0.1, self.lease_seconds / 3))
+            now = time.time()
+            try:
+                with self._lock:
+                    for job_id in self._running:
+                        self._conn.execute(
+                            'UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ?',
+                            (now + self.lease_seconds, job_id, self.owner)
+                        )
+                    self._conn.execute(
+                        "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                        (now - JOB_RETENTION_SECONDS,)
+                    )
+            except sqlite3.Error as e:
+                print(f"❌ Job queue heartbeat error: {str(e)}")
+
+    def stats(self):
+        """Queue depth, oldest queued job age, outcomes and timing histograms"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+            counters = {
+                'completed': self.completed,
+                'failed': self.failed,
+                'lost_leases': self.lost_leases,
+                'recovered': self.recovered,
+                'callbacks_sent': self.callbacks_sent,
+                'callbacks_failed': self.callbacks_failed
+            }
+        return {
+            'path': self.path,
+            'workers': self.workers,
+            'depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'stored': sum(counts.values()),
+            'oldest_queued_age_seconds': round(now - oldest, 3) if oldest is not None else 0.0,
+            **counters,
+            'wait_time_ms': self.wait_time.snapshot(),
+            'run_time_ms': self.run_time.snapshot()
+        }
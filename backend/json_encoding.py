@@ -0,0 +1,74 @@
+"""
+JSON encoding shared by the backend servers
+
+- ``NumpyJSONProvider`` lets ``jsonify`` serialize numpy scalars and arrays
+  (and read-only mappings) directly, so model outputs need no manual
+  ``float()`` / ``int()`` conversion
+- ``freeze`` turns static template tables into immutable structures that
+  are built once at import
+- ``encode_fragment`` / ``spliced_response`` pre-encode those tables to
+  bytes once and splice them into responses, so only the per-request
+  fields are serialized on each call
+"""
+import json
+from types import MappingProxyType
+
+import numpy as np
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+def json_default(value):
+    """Fallback encoder for numpy values and frozen mappings"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that also understands numpy scalars and arrays"""
+
+    @staticmethod
+    def default(value):
+        try:
+            return json_default(value)
+        except TypeError:
+            return DefaultJSONProvider.default(value)
+
+
+def freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def encode_fragment(value):
+    """Compact UTF-8 JSON bytes for a value that never changes"""
+    return json.dumps(
+        value, default=json_default, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def splice_json(fields, fragments):
+    """JSON object bytes from ``fields`` plus pre-encoded ``fragments``
+
+    ``fragments`` maps member names to bytes from ``encode_fragment``; they
+    are appended as-is instead of being serialized again.
+    """
+    body = bytearray(encode_fragment(fields))
+    for name, fragment in fragments.items():
+        body[-1:] = b',' if len(body) > 2 else b''
+        body += encode_fragment(name) + b':' + fragment + b'}'
+    return bytes(body)
+
+
+def spliced_response(fields, fragments):
+    """JSON response built by ``splice_json``"""
+    return Response(splice_json(fields, fragments), mimetype='application/json')
@@ -0,0 +1,226 @@
+"""
+Deadlines, hedging and circuit breaking for slow remote calls
+
+``HedgedCaller`` runs a blocking call on a bounded thread pool and waits at
+most ``deadline_ms`` for it. If the first attempt is still running after the
+recent ``hedge_percentile`` latency, one duplicate attempt is started and
+whichever finishes first wins. Once the call returns or misses its
+deadline, attempts still queued in the pool are cancelled so they never
+reach the dependency; attempts already running cannot be interrupted and
+are counted as abandoned.
+
+``CircuitBreaker`` stops calling the dependency after repeated failures or
+deadline misses, and lets a single trial call through once ``reset_seconds``
+have passed.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import Histogram
+
+
+class DeadlineExceeded(TimeoutError):
+    """No attempt finished within the latency budget"""
+
+
+class CircuitOpenError(RuntimeError):
+    """The circuit breaker is rejecting calls"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker counting consecutive failures"""
+
+    def __init__(self, name, failure_threshold=5, reset_seconds=30):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may go out now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_in_flight:
+                    self.trips += 1
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self):
+        """Breaker state and counters for monitoring"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
+
+
+class HedgedCaller:
+    """Run ``fn`` under a deadline, hedged once after a percentile delay
+
+    ``hedge_percentile`` of 0 disables hedging; hedging also waits until
+    ``min_samples`` latencies have been observed.
+    """
+
+    def __init__(self, name, fn, deadline_ms, hedge_percentile=95, breaker=None,
+                 max_workers=8, window=200, min_samples=20):
+        self.name = name
+        self.fn = fn
+        self.deadline_ms = deadline_ms
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker
+        self.min_samples = min_samples
+        self.latency = Histogram(f'{name}_latency', unit='ms')
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.abandoned = 0
+
+    def _abandon(self, pending):
+        """Cancel attempts still queued; count those already running"""
+        cancelled = abandoned = 0
+        for future in pending:
+            if future.cancel():
+                cancelled += 1
+            elif not future.done():
+                abandoned += 1
+        with self._lock:
+            self.cancelled += cancelled
+            self.abandoned += abandoned
+
+    def _timed(self, args):
+        started = time.perf_counter()
+        try:
+            return self.fn(*args)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.latency.observe(elapsed)
+            with self._lock:
+                self._recent.append(elapsed)
+
+    def hedge_delay_ms(self):
+        """Recent latency percentile, or None while hedging is off"""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            if len(self._recent) < self.min_samples:
+                return None
+            ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    def call(self, *args):
+        """Result of the first attempt to succeed before the deadline
+
+        Raises ``CircuitOpenError`` without calling when the breaker is open,
+        ``DeadlineExceeded`` when the budget runs out, or the attempt's own
+        exception when every attempt failed.
+        """
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        with self._lock:
+            self.calls += 1
+        deadline = time.monotonic() + self.deadline_ms / 1000
+        primary = self._executor.submit(self._timed, args)
+        pending = {primary}
+
+        delay = self.hedge_delay_ms()
+        if delay is not None and delay < self.deadline_ms:
+            done, _ = wait(pending, timeout=delay / 1000)
+            if not done:
+                pending.add(self._executor.submit(self._timed, args))
+                with self._lock:
+                    self.hedges += 1
+
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            done, pending = wait(pending, timeout=max(0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    self._abandon(pending)
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    if future is not primary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+
+        self._abandon(pending)
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        with self._lock:
+            if pending:
+                self.timeouts += 1
+            else:
+                self.failures += 1
+        if pending:
+            raise DeadlineExceeded(f"{self.name} missed its {self.deadline_ms:.0f} ms deadline")
+        raise error
+
+    def stats(self):
+        """Call outcomes, hedge delay and latency histogram for monitoring"""
+        with self._lock:
+            counters = {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'timeouts': self.timeouts,
+                'failures': self.failures,
+                'cancelled': self.cancelled,
+                'abandoned': self.abandoned
+            }
+        delay = self.hedge_delay_ms()
+        counters.update({
+            'deadline_ms': self.deadline_ms,
+            'hedge_delay_ms': round(delay, 1) if delay is not None else None,
+            'latency_ms': self.latency.snapshot()
+        })
+        if self.breaker is not None:
+            counters['breaker'] = self.breaker.stats()
+        return counters
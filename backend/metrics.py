@@ -0,0 +1,139 @@
+"""
+Lightweight in-process metrics shared by the backend servers
+
+Histograms can also be rendered in the Prometheus text exposition format,
+which the servers serve at /api/metrics.
+"""
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with fixed upper bounds"""
+
+    def __init__(self, name, buckets=DEFAULT_BUCKETS, unit=''):
+        self.name = name
+        self.unit = unit
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record a single observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """Return count, sum and cumulative bucket counts as a dict"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            count = self._count
+
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative.append({'le': bound, 'count': running})
+        cumulative.append({'le': '+Inf', 'count': count})
+
+        return {
+            'unit': self.unit,
+            'count': count,
+            'sum': round(total, 3),
+            'mean': round(total / count, 3) if count else 0.0,
+            'buckets': cumulative
+        }
+
+
+class StageTimings:
+    """One latency histogram per pipeline stage, created on first use"""
+
+    def __init__(self, name, label='stage', buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.label = label
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, ms):
+        """Record one run of ``stage`` that took ``ms`` milliseconds"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    stage, Histogram(f'{self.name}_{stage}', self.buckets, unit='ms')
+                )
+        histogram.observe(ms)
+
+    def series(self):
+        """``(labels, histogram)`` pairs, one per stage seen so far"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+        return [({self.label: stage}, histogram) for stage, histogram in items]
+
+    def snapshot(self):
+        """Per-stage histogram snapshots as a dict"""
+        return {labels[self.label]: histogram.snapshot() for labels, histogram in self.series()}
+
+
+# Prometheus base-unit suffixes for the units histograms are recorded in
+PROMETHEUS_UNITS = {'ms': 'milliseconds', 'bytes': 'bytes', 'items': 'items'}
+
+
+def prometheus_name(name, unit=''):
+    """Metric name in Prometheus form: lowercase, underscores, unit suffix"""
+    name = ''.join(char if char.isalnum() else '_' for char in name.lower())
+    suffix = PROMETHEUS_UNITS.get(unit, unit)
+    if suffix and not name.endswith(suffix):
+        name = f'{name}_{suffix}'
+    return name
+
+
+def format_labels(labels):
+    """``{key="value",...}`` with quotes, backslashes and newlines escaped"""
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def render_histogram(name, series, help_text=''):
+    """Prometheus text exposition of one histogram family
+
+    ``series`` is a list of ``(labels, Histogram)`` pairs sharing ``name``.
+    """
+    lines = []
+    if help_text:
+        lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histogram in series:
+        snapshot = histogram.snapshot()
+        for bucket in snapshot['buckets']:
+            bucket_labels = dict(labels, le=bucket['le'])
+            lines.append(f"{name}_bucket{format_labels(bucket_labels)} {bucket['count']}")
+        lines.append(f"{name}_sum{format_labels(labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{format_labels(labels)} {snapshot['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def render_prometheus(stage_timings=(), histograms=(), prefix='moderation'):
+    """Prometheus text format for labelled stage timings and plain histograms"""
+    families = []
+    for timings in stage_timings:
+        name = prometheus_name(f'{prefix}_{timings.name}', 'ms')
+        families.append(render_histogram(name, timings.series(), f'Time spent per {timings.label}'))
+    for histogram in histograms:
+        name = prometheus_name(f'{prefix}_{histogram.name}', histogram.unit)
+        families.append(render_histogram(name, [({}, histogram)]))
+    return ''.join(families)
@@ -0,0 +1,203 @@
+"""
+Thread-safe lazy model loading with warmup and readiness reporting
+
+Each registered model is loaded at most once per process: concurrent first
+callers of ``get`` wait on a per-model lock while a single thread runs the
+loader (single-flight), instead of all of them loading their own copy. A
+failed load is remembered and not retried for ``retry_seconds``.
+
+``warm_in_background`` loads the models on a background thread and runs a
+dummy inference through each, so the first real request does not pay for
+lazy initialization. Until it finishes, ``ready()`` is False and the
+/api/health/ready probe answers 503, while /api/health/live keeps
+answering 200 so the process is not restarted for being slow to warm.
+"""
+import os
+import threading
+import time
+
+from flask import jsonify
+
+from image_io import peak_rss_mb
+
+# Load models and run a dummy inference in the background at startup
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', '0') == '1'
+MODEL_RETRY_SECONDS = float(os.environ.get('MODEL_RETRY_SECONDS', '60'))
+
+LOADED_STATES = ('loaded', 'warming', 'warm')
+
+
+class ModelLoadError(RuntimeError):
+    """The model failed to load recently and is not being retried yet"""
+
+
+def current_rss_mb():
+    """Current resident set size in MB (Linux), else the peak so far"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+class RegisteredModel:
+    """Loader, warmup and load state of one model"""
+
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.lock = threading.Lock()
+        self.value = None
+        self.state = 'unloaded'
+        self.error = None
+        self.failed_at = None
+        self.load_seconds = None
+        self.rss_delta_mb = None
+        self.warmup_ms = None
+
+
+class ModelRegistry:
+    """Named models loaded once on first use
+
+    RSS deltas are measured around each load, so they overlap when two
+    different models load at the same time.
+    """
+
+    def __init__(self, retry_seconds=MODEL_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self._models = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, warmup=None):
+        """Add a model; ``warmup(model)`` runs a dummy inference through it"""
+        self._models[name] = RegisteredModel(name, loader, warmup)
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def is_loaded(self, name):
+        return self._models[name].state in LOADED_STATES
+
+    def get(self, name):
+        """The loaded model, loading it first if no other thread already is
+
+        Raises the loader's exception, or ``ModelLoadError`` while a recent
+        failure is being remembered.
+        """
+        entry = self._models[name]
+        if entry.state in LOADED_STATES:
+            return entry.value
+
+        with entry.lock:
+            if entry.state in LOADED_STATES:
+                return entry.value
+            if entry.state == 'failed' and time.monotonic() - entry.failed_at < self.retry_seconds:
+                raise ModelLoadError(f"{name} failed to load: {entry.error}")
+
+            entry.state = 'loading'
+            rss_before = current_rss_mb()
+            started = time.perf_counter()
+            try:
+                value = entry.loader()
+            except Exception as e:
+                entry.state = 'failed'
+                entry.error = str(e)
+                entry.failed_at = time.monotonic()
+                raise
+
+            entry.load_seconds = time.perf_counter() - started
+            rss_after = current_rss_mb()
+            if rss_before is not None and rss_after is not None:
+                entry.rss_delta_mb = rss_after - rss_before
+            entry.value = value
+            entry.error = None
+            entry.state = 'loaded'
+
+        print(f"📦 Loaded {name} in {entry.load_seconds:.1f}s")
+        return value
+
+    def warm(self, name):
+        """Load a model and run its warmup inference once"""
+        model = self.get(name)
+        entry = self._models[name]
+        if entry.warmup is None or entry.state != 'loaded':
+            return
+
+        entry.state = 'warming'
+        started = time.perf_counter()
+        try:
+            entry.warmup(model)
+            entry.warmup_ms = (time.perf_counter() - started) * 1000
+            print(f"🔥 Warmed {name} in {entry.warmup_ms:.0f} ms")
+        finally:
+            entry.state = 'warm'
+
+    def warm_in_background(self, names=None, before=None, warmup=True, on_done=None):
+        """Load (and warm) models on a daemon thread; ``ready()`` waits for it
+
+        ``before`` runs first on the same thread, e.g. an app's own model
+        initialization; ``on_done`` runs once every model has settled.
+        """
+        names = list(names or self._models)
+        with self._lock:
+            self._pending.update(names)
+
+        def run():
+            if before is not None:
+                try:
+                    before()
+                except Exception as e:
+                    print(f"⚠️ Model initialization failed: {str(e)}")
+            for name in names:
+                try:
+                    if warmup:
+                        self.warm(name)
+                    else:
+                        self.get(name)
+                except Exception as e:
+                    print(f"⚠️ Warmup of {name} failed: {str(e)}")
+                finally:
+                    with self._lock:
+                        self._pending.discard(name)
+            if on_done is not None:
+                on_done()
+
+        threading.Thread(target=run, name='model-warmup', daemon=True).start()
+
+    def ready(self):
+        """Whether no model is loading or waiting to be warmed
+
+        A model that failed to load counts as settled, since the apps fall
+        back to keyword analysis without it.
+        """
+        with self._lock:
+            if self._pending:
+                return False
+        return not any(entry.state in ('loading', 'warming') for entry in self._models.values())
+
+    def stats(self):
+        """Per-model state, load time, RSS growth and warmup time"""
+        return {
+            name: {
+                'state': entry.state,
+                'load_seconds': round(entry.load_seconds, 3) if entry.load_seconds is not None else None,
+                'rss_delta_mb': round(entry.rss_delta_mb, 1) if entry.rss_delta_mb is not None else None,
+                'warmup_ms': round(entry.warmup_ms, 1) if entry.warmup_ms is not None else None,
+                'error': entry.error
+            }
+            for name, entry in self._models.items()
+        }
+
+
+def liveness_response():
+    """The process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+
+def readiness_response(registry):
+    """200 once the models are loaded and warmed, 503 before"""
+    ready = registry.ready()
+    body = {'status': 'ready' if ready else 'warming', 'models': registry.stats()}
+    return jsonify(body), 200 if ready else 503
@@ -0,0 +1,237 @@
+"""
+ONNX Runtime inference for the DistilBERT classifier and ResNet-50
+
+Both models are exported to ONNX once, cached on disk and served through
+ONNX Runtime's CPU provider with all graph optimizations enabled. The
+wrappers are drop-in replacements for the objects app.py calls, and every
+session must pass an output parity check against PyTorch before it is used.
+Sessions are opened per process on first use, so they are safe to load
+before ``serve.py`` forks its workers.
+"""
+import os
+import threading
+
+import numpy as np
+import torch
+
+ONNX_CACHE_DIR = os.environ.get(
+    'ONNX_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'onnx_models')
+)
+ONNX_PARITY_TOLERANCE = float(os.environ.get('ONNX_PARITY_TOLERANCE', '1e-3'))
+ONNX_OPSET = 14
+
+PARITY_TEXTS = [
+    "What a wonderful day at the beach with friends!",
+    "This is the worst service I have ever experienced.",
+]
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Expose a Hugging Face classifier as ``(input_ids, attention_mask) -> logits``"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def cache_path(name):
+    """Location of a cached ONNX export"""
+    return os.path.join(ONNX_CACHE_DIR, f"{name.replace('/', '--')}.onnx")
+
+
+def export_once(module, args, path, input_names, dynamic_axes):
+    """Export ``module`` to ``path`` unless a cached export already exists"""
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    print(f"📦 Exporting ONNX model to {path}...")
+
+    # Export next to the target and rename so other workers never see a partial file
+    partial = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            args,
+            partial,
+            input_names=input_names,
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET
+        )
+    os.replace(partial, path)
+    return path
+
+
+def create_session(path):
+    """Open an ONNX Runtime CPU session with full graph optimization"""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+
+class ProcessLocalSession:
+    """ONNX Runtime session opened on first use in each process
+
+    ORT starts its intra-op thread pool when a session is created, and that
+    pool does not survive ``fork()``: a session inherited by a pre-fork
+    worker can hang on its first run. Each process therefore opens its own
+    session. An inherited one is kept referenced but never used, since
+    freeing it would wait on threads that do not exist in the child.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._session = None
+        self._pid = None
+        self._inherited = []
+        self._lock = threading.Lock()
+
+    def _current(self):
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                if self._session is not None:
+                    self._inherited.append(self._session)
+                self._session = create_session(self.path)
+                self._pid = os.getpid()
+            return self._session
+
+    def run(self, *args, **kwargs):
+        session = self._session
+        if session is None or self._pid != os.getpid():
+            session = self._current()
+        return session.run(*args, **kwargs)
+
+    def close(self):
+        """Free this process's session; the next run opens a new one"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._session = None
+                self._pid = None
+
+
+def softmax(logits):
+    """Row-wise softmax of a logits array"""
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+class OnnxTextClassifier:
+    """Callable with the text-classification pipeline's batch interface"""
+
+    def __init__(self, session, tokenizer, id2label):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.id2label = id2label
+
+    def logits(self, texts):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors='np'
+        )
+        return self.session.run(None, {
+            'input_ids': encoded['input_ids'].astype(np.int64),
+            'attention_mask': encoded['attention_mask'].astype(np.int64)
+        })[0]
+
+    def __call__(self, texts, batch_size=None):
+        single = isinstance(texts, str)
+        probabilities = softmax(self.logits([texts] if single else list(texts)))
+
+        results = [
+            {'label': self.id2label[int(row.argmax())], 'score': float(row.max())}
+            for row in probabilities
+        ]
+        return results[0] if single else results
+
+
+class OnnxImageClassifier:
+    """Callable with the ResNet module's ``batch tensor -> logits`` interface"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def __call__(self, input_batch):
+        logits = self.session.run(None, {'input': input_batch.numpy().astype(np.float32)})[0]
+        return torch.from_numpy(logits)
+
+
+def load_text_classifier(text_pipeline):
+    """Export DistilBERT from a loaded pipeline and wrap it in ONNX Runtime"""
+    model = text_pipeline.model.eval()
+    tokenizer = text_pipeline.tokenizer
+    sample = tokenizer(PARITY_TEXTS, padding=True, return_tensors='pt').to(model.device)
+
+    path = export_once(
+        _LogitsOnly(model),
+        (sample['input_ids'], sample['attention_mask']),
+        cache_path(model.config.name_or_path),
+        ['input_ids', 'attention_mask'],
+        {
+            'input_ids': {0: 'batch', 1: 'sequence'},
+            'attention_mask': {0: 'batch', 1: 'sequence'},
+            'logits': {0: 'batch'}
+        }
+    )
+    session = ProcessLocalSession(path)
+    classifier = OnnxTextClassifier(session, tokenizer, model.config.id2label)
+
+    with torch.no_grad():
+        expected = model(**sample).logits.cpu().numpy()
+    check_parity('DistilBERT', expected, classifier.logits(PARITY_TEXTS))
+    # Closed again so a pre-fork parent holds no ORT thread pool
+    session.close()
+    return classifier
+
+
+def load_image_classifier(resnet_model):
+    """Export ResNet-50 and wrap it in ONNX Runtime"""
+    resnet_model.eval()
+    sample = torch.randn(2, 3, 224, 224, generator=torch.Generator().manual_seed(0))
+
+    path = export_once(
+        resnet_model,
+        (sample,),
+        cache_path('resnet50'),
+        ['input'],
+        {'input': {0: 'batch'}, 'logits': {0: 'batch'}}
+    )
+    session = ProcessLocalSession(path)
+    classifier = OnnxImageClassifier(session)
+
+    with torch.no_grad():
+        expected = resnet_model(sample).numpy()
+    check_parity('ResNet-50', expected, classifier(sample).numpy())
+    session.close()
+    return classifier
+
+
+def check_parity(name, expected, actual):
+    """Raise if ONNX Runtime outputs drift from PyTorch beyond the tolerance"""
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if not np.allclose(expected, actual, rtol=1e-3, atol=ONNX_PARITY_TOLERANCE):
+        raise ValueError(f"{name} ONNX parity check failed (max abs diff {max_diff:.2e})")
+    print(f"✅ {name} ONNX parity check passed (max abs diff {max_diff:.2e})")
+
+
+def load_onnx_models(text_pipeline, resnet_model):
+    """Swap both models for ONNX Runtime sessions, keeping PyTorch on failure
+
+    Returns ``(text_classifier, image_model, engine_name)``.
+    """
+    try:
+        text_classifier = load_text_classifier(text_pipeline)
+        image_model = load_image_classifier(resnet_model)
+        return text_classifier, image_model, 'onnx'
+    except Exception as e:
+        print(f"⚠️ ONNX Runtime unavailable, using PyTorch: {str(e)}")
+        return text_pipeline, resnet_model, 'torch'
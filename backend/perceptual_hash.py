@@ -0,0 +1,138 @@
+"""
+Perceptual image hashing and a Hamming-distance near-duplicate index
+
+A difference hash (dHash) survives recompression, resizing and format
+changes, so a re-encoded re-upload of the same photo lands within a few bits
+of the original and can reuse its vision-model caption.
+
+Flat or low-texture images (solid fills, screenshots that are mostly one
+color) have almost no brightness differences to encode: they all hash to
+about the same value and would share one caption. Images whose mean
+adjacent-pixel difference is below ``PHASH_MIN_GRADIENT`` therefore get no
+hash and skip the index.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+PHASH_MAX_DISTANCE = int(os.environ.get('PHASH_MAX_DISTANCE', '6'))
+PHASH_INDEX_SIZE = int(os.environ.get('PHASH_INDEX_SIZE', '4096'))
+PHASH_MIN_GRADIENT = float(os.environ.get('PHASH_MIN_GRADIENT', '2.0'))
+HASH_BITS = 64
+
+
+def difference_hash(image, hash_size=8):
+    """``(hash, gradient)``: the 64-bit dHash and the mean absolute
+    difference (0-255) between the horizontally adjacent pixels it compares"""
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+
+    value = 0
+    total = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            left, right = pixels[offset + col], pixels[offset + col + 1]
+            value = (value << 1) | (left > right)
+            total += abs(left - right)
+    return value, total / (hash_size * hash_size)
+
+
+def dhash(image, hash_size=8):
+    """64-bit difference hash of a PIL image"""
+    return difference_hash(image, hash_size)[0]
+
+
+def distinctive_dhash(image, min_gradient=PHASH_MIN_GRADIENT):
+    """dHash of an image with enough texture to be told apart, else None"""
+    value, gradient = difference_hash(image)
+    return value if gradient >= min_gradient else None
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class PerceptualIndex:
+    """Bounded LRU map from perceptual hash to a value, searched by Hamming distance
+
+    Hashes are split into ``max_distance + 1`` bands; by the pigeonhole
+    principle any hash within ``max_distance`` bits shares at least one band
+    exactly, so only hashes in matching band buckets are compared.
+    """
+
+    def __init__(self, name, max_distance=PHASH_MAX_DISTANCE, max_entries=PHASH_INDEX_SIZE):
+        self.name = name
+        self.max_distance = max(0, max_distance)
+        self.max_entries = max(1, max_entries)
+
+        band_count = self.max_distance + 1
+        width, extra = divmod(HASH_BITS, band_count)
+        self._bands = []
+        start = 0
+        for i in range(band_count):
+            size = width + (1 if i < extra else 0)
+            self._bands.append((start, (1 << size) - 1))
+            start += size
+
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in self._bands]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _band_keys(self, value):
+        return [(value >> shift) & mask for shift, mask in self._bands]
+
+    def lookup(self, value):
+        """Return the value stored for the nearest hash within range, or None"""
+        with self._lock:
+            candidates = set()
+            for bucket, key in zip(self._buckets, self._band_keys(value)):
+                candidates.update(bucket.get(key, ()))
+
+            best = None
+            best_distance = self.max_distance + 1
+            for candidate in candidates:
+                distance = hamming(value, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best)
+            self.hits += 1
+            return self._entries[best]
+
+    def add(self, value, payload):
+        """Remember ``payload`` for a hash, evicting the least recently used"""
+        with self._lock:
+            if value not in self._entries:
+                for bucket, key in zip(self._buckets, self._band_keys(value)):
+                    bucket.setdefault(key, set()).add(value)
+            self._entries[value] = payload
+            self._entries.move_to_end(value)
+
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                for bucket, key in zip(self._buckets, self._band_keys(evicted)):
+                    members = bucket[key]
+                    members.discard(evicted)
+                    if not members:
+                        del bucket[key]
+
+    def stats(self):
+        """Size and hit counts for monitoring"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_distance': self.max_distance,
+                'hits': self.hits,
+                'misses': self.misses
+            }
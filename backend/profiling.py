@@ -0,0 +1,126 @@
+"""
+On-demand profiling of single /api/analyze requests
+
+With ``ENABLE_PROFILING=1``, a request sent with ``?profile=1`` (or an
+``X-Profile: 1`` header) runs under cProfile and, once torch is loaded,
+``torch.profiler``. The JSON response gains a ``profile`` object with the
+top functions by cumulative time and the top torch operators by CPU time.
+
+cProfile only follows the request's own thread, so time the request spent
+waiting on a micro-batcher shows up as a wait (e.g. in ``Future.result``);
+the torch operator table covers the model forward passes on every thread,
+including those of requests sharing the batch. One request is profiled at
+a time.
+
+When profiling is disabled, ``profiled`` returns the view unchanged, so
+there is no per-request cost at all.
+"""
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+
+from flask import current_app, make_response, request
+
+ENABLE_PROFILING = os.environ.get('ENABLE_PROFILING', '0') == '1'
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', '30'))
+PROFILE_HEADER = 'X-Profile'
+
+# cProfile (sys.monitoring on Python 3.12+) and torch.profiler are process-wide
+profile_lock = threading.Lock()
+
+
+def profile_requested():
+    """Whether the current request asked to be profiled"""
+    return request.args.get('profile') == '1' or request.headers.get(PROFILE_HEADER) == '1'
+
+
+def top_functions(profiler, limit=PROFILE_TOP_N):
+    """The ``limit`` functions with the highest cumulative time"""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': pstats.func_std_string(func),
+            'calls': calls,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3)
+        }
+        for func, (_, calls, total, cumulative, _) in rows
+    ]
+
+
+def top_torch_ops(torch_profiler, limit=PROFILE_TOP_N):
+    """The ``limit`` torch operators with the highest total CPU time"""
+    events = sorted(torch_profiler.key_averages(), key=lambda event: event.cpu_time_total, reverse=True)
+    return [
+        {
+            'op': event.key,
+            'calls': event.count,
+            'cpu_total_ms': round(event.cpu_time_total / 1000, 3),
+            'self_cpu_ms': round(event.self_cpu_time_total / 1000, 3)
+        }
+        for event in events[:limit]
+    ]
+
+
+def start_torch_profiler():
+    """A running torch profiler, or None while torch is not loaded
+
+    torch is not imported here: with deferred model loading it may not be
+    loaded yet, and the servers that never use it should not pay for it.
+    """
+    torch = sys.modules.get('torch')
+    if torch is None:
+        return None
+    activities = [torch.profiler.ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(torch.profiler.ProfilerActivity.CUDA)
+    torch_profiler = torch.profiler.profile(activities=activities)
+    torch_profiler.start()
+    return torch_profiler
+
+
+def run_profiled(view, args, kwargs):
+    """Call ``view`` under the profilers and return ``(response, profile)``"""
+    with profile_lock:
+        torch_profiler = start_torch_profiler()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            response = make_response(profiler.runcall(view, *args, **kwargs))
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            if torch_profiler is not None:
+                torch_profiler.stop()
+
+    return response, {
+        'wall_ms': round(wall_ms, 3),
+        'functions': top_functions(profiler),
+        'torch_ops': top_torch_ops(torch_profiler) if torch_profiler is not None else None
+    }
+
+
+def profiled(view):
+    """Let a JSON view be profiled on request when ENABLE_PROFILING is set"""
+    if not ENABLE_PROFILING:
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not profile_requested():
+            return view(*args, **kwargs)
+
+        response, profile = run_profiled(view, args, kwargs)
+        body = response.get_json(silent=True)
+        if not isinstance(body, dict):
+            return response
+        body['profile'] = profile
+        response.set_data(current_app.json.dumps(body))
+        print(f"🔬 Profiled {request.path} in {profile['wall_ms']:.0f} ms")
+        return response
+
+    return wrapper
@@ -0,0 +1,76 @@
+"""
+Per-stage request timing: histograms, /api/metrics and Server-Timing
+
+Pipeline stages (decode, ResNet, GPT-2, Gemini, JSON encoding, ...) are
+wrapped in ``timed_stage``. Every run is recorded in a per-stage latency
+histogram, and runs on a request's own thread are also collected in
+``flask.g`` and returned in a ``Server-Timing`` header, which browser
+devtools show in the network panel's Timing tab. Stages that run on
+worker threads (micro-batchers, batch pools) only reach the histograms.
+
+Streamed responses send their headers before the stages run, so their
+``Server-Timing`` only covers request parsing.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+from metrics import StageTimings, render_prometheus
+
+# Add a Server-Timing header to every response
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+stage_timings = StageTimings('stage_latency', label='stage')
+request_timings = StageTimings('request_latency', label='endpoint')
+
+
+@contextmanager
+def timed_stage(stage):
+    """Time a pipeline stage into its histogram and the request's Server-Timing"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        stage_timings.observe(stage, ms)
+        if has_request_context():
+            g.setdefault('stage_timings', []).append((stage, ms))
+
+
+def server_timing_header(timings, total_ms):
+    """``Server-Timing`` value: each stage's summed time, in first-run order, then the total"""
+    durations = {}
+    for stage, ms in timings:
+        durations[stage] = durations.get(stage, 0.0) + ms
+    entries = [f'{stage};dur={ms:.1f}' for stage, ms in durations.items()]
+    entries.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(entries)
+
+
+def init_request_timing(app):
+    """Time every request by endpoint and add the Server-Timing header"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        total_ms = (time.perf_counter() - started) * 1000
+        request_timings.observe(request.endpoint or 'unknown', total_ms)
+        if SERVER_TIMING:
+            response.headers['Server-Timing'] = server_timing_header(g.get('stage_timings', ()), total_ms)
+        return response
+
+
+def metrics_response(histograms=()):
+    """Stage and request latency plus the app's other histograms, for Prometheus"""
+    body = render_prometheus(stage_timings=(stage_timings, request_timings), histograms=histograms)
+    return Response(body, content_type=METRICS_CONTENT_TYPE)
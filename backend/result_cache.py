@@ -0,0 +1,99 @@
+"""
+Content-addressed analysis result cache with LRU and TTL eviction
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', '1024'))
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get('RESULT_CACHE_TTL_SECONDS', '600'))
+
+# GPT-2 captions are sampled, so serving them from cache is opt-in
+RESULT_CACHE_REUSE_CAPTIONS = os.environ.get('RESULT_CACHE_REUSE_CAPTIONS', '0') == '1'
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially re-spaced submissions share a key"""
+    return ' '.join((text or '').split())
+
+
+def content_key(image_bytes, text, platform=''):
+    """Hash decoded image bytes, normalized text and platform into a cache key"""
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(image_bytes or b'').digest())
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update((platform or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl_seconds``
+
+    A ``ttl_seconds`` of 0 disables expiry. Values are shared between hits,
+    so callers must not mutate what they get back.
+    """
+
+    def __init__(self, name, max_entries=RESULT_CACHE_MAX_ENTRIES,
+                 ttl_seconds=RESULT_CACHE_TTL_SECONDS):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, evicting least recently used entries"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit, miss and eviction counts for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
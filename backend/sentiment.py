@@ -0,0 +1,187 @@
+"""
+Token-aware sliding-window sentiment scoring for long posts
+
+DistilBERT sees at most 512 tokens, so long posts are split into windows
+of ``SENTIMENT_WINDOW_TOKENS`` tokens overlapping by
+``SENTIMENT_WINDOW_OVERLAP``, cut at token offsets (and on word
+boundaries, so re-tokenizing a window gives back the same tokens). All
+windows are queued on the model's micro-batcher at once, so they share
+forward passes, and their results are combined:
+
+- ``max_negative``: the most negative window decides, so one abusive
+  passage in a long post is not averaged away (the default, for moderation)
+- ``mean``: the negative probability averaged over windows
+
+Texts no longer than the window in characters skip tokenization entirely:
+WordPiece never yields more tokens than characters. Only the first
+``SENTIMENT_MAX_WINDOWS`` windows of very long texts are scored.
+
+Results can be kept in an LRU keyed on the model version and the
+normalized text (casefolded, whitespace collapsed), so resubmitted captions
+skip the classifier. The original text is always what gets scored; the key
+only folds differences the uncased DistilBERT model does not see. Hashtags
+stay in the key, so posts with different tags are scored separately.
+"""
+import os
+import threading
+from concurrent.futures import Future
+
+from result_cache import ResultCache
+
+SENTIMENT_WINDOW_TOKENS = int(os.environ.get('SENTIMENT_WINDOW_TOKENS', '500'))
+SENTIMENT_WINDOW_OVERLAP = int(os.environ.get('SENTIMENT_WINDOW_OVERLAP', '64'))
+SENTIMENT_AGGREGATION = os.environ.get('SENTIMENT_AGGREGATION', 'max_negative').lower()
+SENTIMENT_MAX_WINDOWS = int(os.environ.get('SENTIMENT_MAX_WINDOWS', '32'))
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.environ.get('SENTIMENT_CACHE_MAX_ENTRIES', '4096'))
+
+AGGREGATIONS = ('max_negative', 'mean')
+
+
+def normalize_sentiment_text(text):
+    """Cache key form of ``text``: casefolded, with whitespace collapsed"""
+    return ' '.join(text.casefold().split())
+
+
+def make_sentiment_cache(max_entries=SENTIMENT_CACHE_MAX_ENTRIES):
+    """LRU for sentiment results (entries never expire), or None when disabled"""
+    if max_entries <= 0:
+        return None
+    return ResultCache('sentiment', max_entries=max_entries, ttl_seconds=0)
+
+
+def negative_probability(result):
+    """P(NEGATIVE) from a binary classifier result"""
+    return result['score'] if result['label'] == 'NEGATIVE' else 1 - result['score']
+
+
+def aggregate_sentiment(results, rule=SENTIMENT_AGGREGATION):
+    """Combine per-window ``{'label', 'score'}`` results into one"""
+    if len(results) == 1:
+        return results[0]
+
+    if rule == 'mean':
+        negative = sum(negative_probability(result) for result in results) / len(results)
+        combined = (
+            {'label': 'NEGATIVE', 'score': negative} if negative > 0.5
+            else {'label': 'POSITIVE', 'score': 1 - negative}
+        )
+    else:
+        combined = dict(max(results, key=negative_probability))
+
+    combined['windows'] = len(results)
+    return combined
+
+
+class WindowedSentiment:
+    """Score texts of any length through a micro-batched classifier
+
+    ``batcher`` is the classifier's ``MicroBatcher``; ``tokenizer`` should be
+    the classifier's own (fast) tokenizer so windows match its token budget.
+    With a ``cache``, results are shared by texts that normalize alike and
+    ``model_version`` keeps entries of different models apart.
+    """
+
+    def __init__(self, tokenizer, batcher, window_tokens=SENTIMENT_WINDOW_TOKENS,
+                 overlap=SENTIMENT_WINDOW_OVERLAP, aggregation=SENTIMENT_AGGREGATION,
+                 max_windows=SENTIMENT_MAX_WINDOWS, cache=None, model_version=''):
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"SENTIMENT_AGGREGATION must be one of {', '.join(AGGREGATIONS)}")
+        self.tokenizer = tokenizer
+        self.batcher = batcher
+        self.window_tokens = max(8, window_tokens)
+        self.overlap = min(max(0, overlap), self.window_tokens // 2)
+        self.aggregation = aggregation
+        self.max_windows = max(1, max_windows)
+        self.cache = cache
+        self.model_version = model_version
+
+    def windows(self, text):
+        """Substrings of ``text`` that each fit in one forward pass"""
+        if len(text) <= self.window_tokens:
+            return [text]
+        if not getattr(self.tokenizer, 'is_fast', False):
+            return self._char_windows(text)
+
+        encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding['offset_mapping']
+        word_ids = encoding.word_ids()
+        count = len(offsets)
+        if count <= self.window_tokens:
+            return [text]
+
+        def word_start(index, floor):
+            # Step back to the first token of the word containing ``index``,
+            # unless the word is so long that it would reach ``floor``
+            aligned = index
+            while aligned > floor and word_ids[aligned] == word_ids[aligned - 1]:
+                aligned -= 1
+            return aligned if aligned > floor else index
+
+        windows = []
+        start = 0
+        while len(windows) < self.max_windows:
+            end = min(start + self.window_tokens, count)
+            if end < count:
+                end = word_start(end, start + self.window_tokens // 2)
+            windows.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end >= count:
+                break
+            next_start = max(end - self.overlap, start + 1)
+            start = word_start(next_start, max(start, next_start - self.overlap))
+        return windows
+
+    def _char_windows(self, text):
+        """Character windows for slow tokenizers (one token per char at most)"""
+        step = self.window_tokens - self.overlap
+        starts = range(0, len(text) - self.overlap, step)
+        return [text[start:start + self.window_tokens] for start in starts][:self.max_windows]
+
+    def score_async(self, text):
+        """Future for the aggregated ``{'label', 'score'}`` of ``text``
+
+        Cached results are shared, so callers must not mutate them.
+        """
+        if self.cache is None:
+            return self._score_windows_async(text)
+
+        key = (self.model_version, normalize_sentiment_text(text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        def store(future):
+            if future.exception() is None:
+                self.cache.put(key, future.result())
+
+        future = self._score_windows_async(text)
+        future.add_done_callback(store)
+        return future
+
+    def _score_windows_async(self, text):
+        futures = [self.batcher.submit_async(window) for window in self.windows(text)]
+        if len(futures) == 1:
+            return futures[0]
+
+        combined = Future()
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def window_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                combined.set_result(aggregate_sentiment([f.result() for f in futures], self.aggregation))
+            except Exception as e:
+                combined.set_exception(e)
+
+        for future in futures:
+            future.add_done_callback(window_done)
+        return combined
+
+    def score(self, text):
+        """Aggregated ``{'label', 'score'}`` of ``text``, blocking"""
+        return self.score_async(text).result()
@@ -0,0 +1,176 @@
+"""
+Pre-fork production server for the backend apps
+Run from the backend directory: python serve.py app --workers 4 [--port 5000]
+
+The parent process imports the app, loads its models once and freezes the
+garbage collector, then binds the listening socket and forks the workers.
+Model weights are inherited copy-on-write: inference only reads them, and
+with ``gc.freeze()`` the collector no longer writes to the pages holding
+the loaded objects, so resident memory does not grow with every worker.
+Each worker serves the shared socket with a threaded werkzeug server (so
+the micro-batchers still combine concurrent requests) and limits torch to
+its share of the cores. Dead workers are replaced.
+
+On platforms without ``os.fork`` (Windows) the app is served by a single
+threaded process instead.
+"""
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+
+from model_registry import MODEL_WARMUP
+
+# Tokenizer thread pools do not survive fork (ONNX Runtime sessions are
+# opened per process by onnx_engine for the same reason)
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+# Model loaders to run in the parent, per app module
+PRELOAD = {
+    'app': 'initialize_models',
+    'app_vision': 'load_models_if_needed'
+}
+
+SERVE_WORKERS = int(os.environ.get('SERVE_WORKERS', '2'))
+SERVE_TORCH_THREADS = int(os.environ.get('SERVE_TORCH_THREADS', '0'))
+SERVE_BACKLOG = int(os.environ.get('SERVE_BACKLOG', '128'))
+
+
+def load_app(module_name):
+    """Import an app module and run its model loader"""
+    module = importlib.import_module(module_name)
+    loader = PRELOAD.get(module_name)
+    if loader:
+        getattr(module, loader)()
+    return module
+
+
+def torch_threads_per_worker(workers):
+    """Intra-op threads per worker so all workers together fill the cores once"""
+    if SERVE_TORCH_THREADS > 0:
+        return SERVE_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def bind_socket(host, port):
+    """Listening socket inherited by every worker"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(SERVE_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(module, sock, torch_threads):
+    """Serve requests on the inherited socket until killed (child process)"""
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(torch_threads)
+
+    # Pooled SQLAlchemy connections belong to the parent
+    db = getattr(module, 'db', None)
+    if db is not None:
+        with module.app.app_context():
+            db.engine.dispose(close=False)
+
+    job_queue = getattr(module, 'job_queue', None)
+    if job_queue is not None:
+        job_queue.start()
+
+    # Dummy inference runs per worker, after fork, so the parent never
+    # starts torch's thread pools
+    models = getattr(module, 'models', None)
+    if models is not None and MODEL_WARMUP:
+        models.warm_in_background()
+
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, module.app, threaded=True, fd=sock.fileno())
+    print(f"👷 Worker {os.getpid()} serving with {torch_threads} torch threads")
+    server.serve_forever()
+
+
+def spawn_worker(module, sock, torch_threads):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(module, sock, torch_threads)
+        finally:
+            os._exit(1)
+    return pid
+
+
+def serve_prefork(module, host, port, workers):
+    """Fork ``workers`` processes on one socket and keep them running"""
+    torch_threads = torch_threads_per_worker(workers)
+    sock = bind_socket(host, port)
+
+    # Objects loaded so far are never collected, so the collector leaves
+    # their pages untouched and the workers keep sharing them
+    gc.collect()
+    gc.freeze()
+
+    children = {spawn_worker(module, sock, torch_threads) for _ in range(workers)}
+    print(f"🚀 {module.__name__} listening on http://{host}:{port} with {workers} workers")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"⚠️ Worker {pid} exited with status {status}, restarting")
+            time.sleep(1)
+            children.add(spawn_worker(module, sock, torch_threads))
+
+    sock.close()
+    print("👋 All workers stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('app', nargs='?', default='app', help='app module to serve (app, app_vision, app_smart, app_simple)')
+    parser.add_argument('--workers', type=int, default=SERVE_WORKERS)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    module = load_app(args.app)
+
+    if not hasattr(os, 'fork'):
+        print("⚠️ os.fork is unavailable; serving from a single process")
+        job_queue = getattr(module, 'job_queue', None)
+        if job_queue is not None:
+            job_queue.start()
+        models = getattr(module, 'models', None)
+        if models is not None and MODEL_WARMUP:
+            models.warm_in_background()
+        module.app.run(host=args.host, port=args.port, threaded=True)
+    else:
+        serve_prefork(module, args.host, args.port, max(1, args.workers))
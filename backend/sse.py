@@ -0,0 +1,38 @@
+"""
+Server-Sent Events helpers for progressive analysis responses
+"""
+import json
+
+from flask import Response, stream_with_context
+
+from json_encoding import json_default
+
+
+def format_event(event, data):
+    """Encode one named SSE event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=json_default)}\n\n"
+
+
+def event_stream(events):
+    """Stream ``(event, data)`` pairs from a generator as text/event-stream
+
+    A final ``done`` event marks success; failures after the stream has
+    started are reported as an ``error`` event since the status is already sent.
+    """
+    def encode():
+        try:
+            for event, data in events:
+                yield format_event(event, data)
+            yield format_event('done', {})
+        except Exception as e:
+            print(f"❌ Stream error: {str(e)}")
+            yield format_event('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(encode()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
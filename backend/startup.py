@@ -0,0 +1,58 @@
+"""
+Fast-startup switches and an opt-in startup timing report
+
+With ``FAST_STARTUP=1`` an app binds its socket first and loads its models
+on a background thread; /api/health/ready answers 503 until they are in,
+and requests that arrive earlier wait for the same load. Heavy libraries
+(torch, transformers, cv2, torchvision) are imported by the loaders that
+need them, so they are part of model-load time rather than import time.
+
+``STARTUP_REPORT=1`` prints how long the app spent importing modules,
+loading each model, running its first (warmup) inference and reaching
+``app.run``.
+"""
+import os
+import time
+
+FAST_STARTUP = os.environ.get('FAST_STARTUP', '0') == '1'
+STARTUP_REPORT = os.environ.get('STARTUP_REPORT', '0') == '1'
+
+
+def is_reloader_parent():
+    """Whether this is the debug reloader's watcher, which never serves requests"""
+    return os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+
+class StartupProfile:
+    """Milestones of one process's startup, in ms since the profile was created
+
+    Create it before the app's other imports so import time is included.
+    Milestones may be marked from any thread.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.milestones = []
+
+    def mark(self, milestone):
+        """Record that ``milestone`` was reached now"""
+        self.milestones.append((milestone, (time.perf_counter() - self.started) * 1000))
+
+    def report(self, models=None):
+        """Print the milestones and, from the registry, per-model load and warmup times"""
+        if not STARTUP_REPORT:
+            return
+
+        print("=" * 60)
+        print(f"⏱️ Startup report: {self.name} (pid {os.getpid()})")
+        print("=" * 60)
+        for milestone, ms in sorted(self.milestones, key=lambda item: item[1]):
+            print(f"  {milestone:<40} at {ms:>9.0f} ms")
+        if models is not None:
+            for model_name, stats in models.stats().items():
+                load = f"{stats['load_seconds'] * 1000:.0f} ms" if stats['load_seconds'] is not None else stats['state']
+                warmup = f"{stats['warmup_ms']:.0f} ms" if stats['warmup_ms'] is not None else '-'
+                rss = f"{stats['rss_delta_mb']:+.0f} MB" if stats['rss_delta_mb'] is not None else ''
+                print(f"  {model_name:<20} load {load:>10}  first inference {warmup:>8}  {rss}")
+        print("=" * 60)
@@ -0,0 +1,107 @@
+"""
+Keyword theme detection shared by the backend servers
+
+Every theme keyword lives in one table, compiled at import into a single
+prefix-trie regular expression. One scan of the text finds all theme hits,
+and the table order decides which theme wins when several match.
+"""
+import re
+
+# Highest priority first
+THEME_KEYWORDS = (
+    ('sunset', ('sunset', 'sun setting', 'dusk', 'twilight', 'evening', 'orange sky', 'golden hour')),
+    ('ocean', ('ocean', 'sea', 'beach', 'water', 'wave', 'coast', 'shore')),
+    ('nature', ('tree', 'forest', 'mountain', 'landscape', 'outdoor', 'nature', 'plant', 'flower',
+                'garden', 'green', 'scenic')),
+    ('food', ('food', 'meal', 'dish', 'plate', 'eating', 'dinner', 'lunch', 'breakfast', 'dining',
+              'restaurant', 'cooking', 'delicious', 'table with')),
+    ('people', ('person', 'people', 'man', 'woman', 'child', 'face', 'friend', 'family', 'selfie',
+                'group', 'crowd', 'portrait')),
+    ('animal', ('dog', 'cat', 'animal', 'pet', 'bird', 'horse', 'wildlife')),
+    ('city', ('city', 'building', 'urban', 'street', 'skyline', 'downtown', 'architecture')),
+    ('sky', ('sky', 'cloud')),
+    ('indoor', ('room', 'indoor', 'inside', 'interior', 'bedroom', 'office')),
+    ('sports', ('sport', 'playing', 'game', 'ball', 'field', 'court', 'athlete')),
+    ('travel', ('travel', 'vacation', 'trip', 'destination', 'adventure', 'explore')),
+)
+
+
+def trie_pattern(words):
+    """Regex source matching any of ``words``, factored by common prefix
+
+    ``sea|seashore|sky`` becomes ``s(?:ea(?:shore)?|ky)``, so the regex
+    engine checks each shared prefix once instead of once per keyword.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Optional groups are greedy, so the longest keyword at a position wins
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class ThemeMatcher:
+    """Finds every theme whose keywords occur in a text in one regex pass
+
+    Matching keeps plain substring semantics (``keyword in text``). Each
+    match is the longest keyword starting at its position; any shorter
+    keyword matching there is a prefix of it, and its themes are credited
+    through ``_themes_by_match``. The search resumes one character after
+    each match start so overlapping keywords are found too.
+    """
+
+    def __init__(self, table):
+        self.priority = {theme: rank for rank, (theme, _) in enumerate(table)}
+
+        themes_by_keyword = {}
+        for theme, keywords in table:
+            for keyword in keywords:
+                themes_by_keyword.setdefault(keyword, set()).add(theme)
+
+        self._themes_by_match = {
+            keyword: frozenset(
+                theme
+                for other, themes in themes_by_keyword.items()
+                if keyword.startswith(other)
+                for theme in themes
+            )
+            for keyword in themes_by_keyword
+        }
+        self._search = re.compile(trie_pattern(themes_by_keyword)).search
+
+    def hits(self, text):
+        """Set of themes with at least one keyword in ``text``"""
+        text = text.lower()
+        found = set()
+        match = self._search(text)
+        while match is not None:
+            found |= self._themes_by_match[match.group()]
+            match = self._search(text, match.start() + 1)
+        return found
+
+    def best(self, text, themes=None, default=None):
+        """Highest-priority theme hit, optionally restricted to ``themes``"""
+        found = self.hits(text)
+        if themes is not None:
+            found.intersection_update(themes)
+        if not found:
+            return default
+        return min(found, key=self.priority.__getitem__)
+
+
+theme_matcher = ThemeMatcher(THEME_KEYWORDS)
+
+
+def detect_theme(text, themes=None, default='general'):
+    """Theme of ``text`` by keyword, or ``default`` when nothing matches"""
+    return theme_matcher.best(text or '', themes=themes, default=default)
@@ -56,6 +56,63 @@ export const analyzeContent = async (text, image, platform = 'instagram') => {
   }
 };
 
+/**
+ * Stream analysis results as each backend stage finishes (Server-Sent Events)
+ * @param {string} text - Text content to analyze
+ * @param {File|string} image - Image file or base64 string
+ * @param {string} platform - Platform selection (instagram, facebook, linkedin, twitter)
+ * @param {Function} onEvent - Called with (event, data) for moderation, image_analysis,
+ *   insights and one captions event per platform
+ * @returns {Promise} - Resolves when the stream reports done
+ */
+export const analyzeContentStream = async (text, image, platform = 'instagram', onEvent = () => {}) => {
+  let imageBase64 = '';
+  if (image) {
+    imageBase64 = await imageToBase64(image);
+  }
+
+  // EventSource only supports GET, so the stream is read from a POST fetch
+  const response = await fetch(`${AI_API_CONFIG.baseURL}/analyze/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      text: text || '',
+      image: imageBase64,
+      platform: platform || 'instagram',
+    }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`Stream request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const messages = buffer.split('\n\n');
+    buffer = messages.pop();
+
+    for (const message of messages) {
+      const eventLine = message.split('\n').find((line) => line.startsWith('event: '));
+      const dataLine = message.split('\n').find((line) => line.startsWith('data: '));
+      if (!eventLine || !dataLine) continue;
+
+      const event = eventLine.slice('event: '.length);
+      const data = JSON.parse(dataLine.slice('data: '.length));
+      if (event === 'error') {
+        throw new Error(data.error);
+      }
+      onEvent(event, data);
+    }
+  }
+};
+
 /**
  * Check backend health status
  * @returns {Promise} - Health status
@@ -110,5 +167,6 @@ export const checkHealth = async () => {
 
 export default {
   analyzeContent,
+  analyzeContentStream,
   checkHealth,
 };